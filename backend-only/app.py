@@ -1,12 +1,12 @@
 import gevent.monkey
 gevent.monkey.patch_all()
 
-from flask import Flask, request, jsonify, render_template
-from flask_cors import CORS
+import gevent
+import gevent.pool
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 try:
-    from flask_limiter.extension import RedisStorage
     import redis
     REDIS_AVAILABLE = True
 except ImportError:
@@ -14,21 +14,41 @@ except ImportError:
 from services.url_checker import check_url
 from services.ssl_checker import check_ssl
 from services.link_expander import expand_link
-from services.breach_checker import check_password_breach, check_password_strength, comprehensive_security_check, load_breach_data
+from services.breach_checker import check_password_breach, check_password_strength, comprehensive_security_check, load_breach_data, get_breach_count
 from services.email_text_detector import email_detector
+from services.ml_detector import detector
 from utils.risk_scorer import RiskScorer, quick_risk_assessment
 from utils.logger import get_security_logger
 from utils.config import get_settings
 from utils.health import get_health_checker
-from utils.cache import get_cache
+from utils.cache import cached
+from utils.log_index import get_log_index, FEEDBACK_FILE
+from utils.feedback_writer import get_feedback_writer
+from utils.json_provider import OrjsonProvider, ORJSON_OPTIONS
+from utils.concurrency import ConcurrencyLimiter
+from utils.jsonl import iter_jsonl_reversed, tail_jsonl
+from utils.batch_predictor import BatchPredictor
+from utils.responses import encode_check_response
 import os
+import re
+import sys
+import fcntl
+import subprocess
+import string
 import logging
 import bleach
 import validators
 import traceback
 import time
-import json
-from datetime import datetime
+import hmac
+import orjson
+import numpy as np
+import threading
+import functools
+import heapq
+import operator
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from email_validator import validate_email as validate_email_lib, EmailNotValidError
 from dotenv import load_dotenv
 
@@ -39,12 +59,24 @@ load_dotenv()
 settings = get_settings()
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Initialize security logger
 security_logger = get_security_logger()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+def create_redis_pool(storage_url):
+    """Create a bounded, blocking Redis connection pool"""
+    return redis.BlockingConnectionPool.from_url(
+        storage_url,
+        max_connections=settings.redis_max_connections,
+        timeout=2,
+        socket_timeout=1,
+        socket_connect_timeout=1,
+        socket_keepalive=True
+    )
+
 # Initialize rate limiter with Redis support for production
 def create_limiter(app):
     """Create rate limiter with appropriate storage backend"""
@@ -52,17 +84,24 @@ def create_limiter(app):
     
     if REDIS_AVAILABLE and storage_url:
         try:
-            # Use Redis for production
-            storage = RedisStorage.from_url(storage_url)
-            logger.info(f"Rate limiter using Redis storage: {storage_url}")
+            # Use Redis for production. The limiter gets its own pool so that
+            # short-lived rate-limit traffic never starves persistent cache users.
+            limiter_pool = create_redis_pool(storage_url)
+            app.extensions['redis_limiter_pool'] = limiter_pool
+            app.extensions['redis_pool'] = create_redis_pool(storage_url)
+            logger.info("Rate limiter using Redis storage: %s", storage_url)
             limiter = Limiter(
-                storage=storage,
+                get_remote_address,
+                storage_uri=storage_url,
+                storage_options={"connection_pool": limiter_pool},
                 default_limits=["200 per day", "50 per hour"]
             )
             limiter.init_app(app)
             return limiter
         except Exception as e:
-            logger.warning(f"Failed to initialize Redis for rate limiting: {str(e)}. Using in-memory storage.")
+            app.extensions.pop('redis_limiter_pool', None)
+            app.extensions.pop('redis_pool', None)
+            logger.warning("Failed to initialize Redis for rate limiting: %s. Using in-memory storage.", e)
     
     # Fallback to in-memory storage for development
     if not storage_url:
@@ -77,18 +116,74 @@ def create_limiter(app):
 
 limiter = create_limiter(app)
 
+# Per-caller cap on in-flight outbound checks, plus a process-wide bound on blocking service calls
+concurrency_limiter = ConcurrencyLimiter(settings.max_concurrent_checks, app.extensions.get('redis_pool'))
+service_pool = gevent.pool.Pool(settings.service_pool_size)
+COMPREHENSIVE_CHECK_TIMEOUT = 25
+
+# URL scores at or beyond these bounds skip the SSL and link checks in comprehensive-check
+DECISIVE_HIGH_RISK = 95
+DECISIVE_LOW_RISK = 2
+
+# Stateless apart from constant weights, so one instance serves every request
+SCORER = RiskScorer()
+
+# Concurrent email-text predictions share one vectorizer/model call
+email_batcher = BatchPredictor(email_detector.predict_batch)
+
 # Disable Flask-Talisman for extension compatibility
 # Add basic security headers manually
-@app.after_request
-def add_security_headers(response):
-    """Add basic security headers"""
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    return response
+SECURITY_HEADERS = (
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-XSS-Protection', '1; mode=block'),
+)
+
+class StaticHeadersMiddleware:
+    """WSGI middleware that appends a fixed set of headers to every response"""
+
+    def __init__(self, wsgi_app, headers):
+        self.wsgi_app = wsgi_app
+        self.headers = headers
+
+    def __call__(self, environ, start_response):
+        def add_headers(status, headers, exc_info=None):
+            headers.extend(self.headers)
+            return start_response(status, headers, exc_info)
+        return self.wsgi_app(environ, add_headers)
 
 # Configure CORS for API access
-CORS(app, origins=["*"], supports_credentials=True, methods=["GET", "POST", "OPTIONS"], allow_headers=["Content-Type", "Authorization", "X-Requested-With", "X-API-Key"])
+CORS_ALLOW_METHODS = 'GET, POST, OPTIONS'
+CORS_ALLOW_HEADERS = 'Content-Type, Authorization, X-Requested-With, X-API-Key'
+
+@functools.lru_cache(maxsize=1024)
+def cors_headers_for(origin):
+    """Build the CORS response headers for a request origin"""
+    return (
+        ('Access-Control-Allow-Origin', origin or '*'),
+        ('Access-Control-Allow-Methods', CORS_ALLOW_METHODS),
+        ('Access-Control-Allow-Headers', CORS_ALLOW_HEADERS),
+        ('Access-Control-Allow-Credentials', 'true'),
+    )
+
+class CorsMiddleware:
+    """WSGI middleware that adds CORS headers and answers preflight requests without entering Flask"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        cors_headers = cors_headers_for(environ.get('HTTP_ORIGIN', ''))
+        if environ.get('REQUEST_METHOD') == 'OPTIONS':
+            start_response('204 No Content', list(cors_headers))
+            return []
+
+        def add_headers(status, headers, exc_info=None):
+            headers.extend(cors_headers)
+            return start_response(status, headers, exc_info)
+        return self.wsgi_app(environ, add_headers)
+
+app.wsgi_app = StaticHeadersMiddleware(CorsMiddleware(app.wsgi_app), SECURITY_HEADERS)
 
 # Configuration from settings
 app.config['DEBUG'] = settings.debug
@@ -99,28 +194,133 @@ app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Disable caching for security
 app.config['API_KEY'] = settings.api_key
 app.config['TIMEOUT'] = settings.request_timeout
 
+# Credentials are encoded once so the auth decorators only do a constant-time compare
+_API_KEY = settings.api_key.encode() if settings.api_key else b''
+_ADMIN_USERNAME = settings.admin_username.encode()
+_ADMIN_PASSWORD = settings.admin_password.encode()
+
+# Incremental in-memory index over the log and feedback files. Readers refresh it on demand;
+# indexing the existing files once here lets preloaded workers inherit a warm index
+log_index = get_log_index()
+log_index.refresh()
+
+# Feedback records are appended in batches from a background writer
+feedback_writer = get_feedback_writer()
+
+# Feedback IDs continue from the number of records already on disk
+FEEDBACK_ID_KEY = 'phisguard:feedback_id'
+FEEDBACK_ID_FILE = 'data/feedback.id'
+TRAINING_METADATA_FILE = 'data/training_metadata.jsonl'
+RETRAIN_PID_FILE = 'data/retrain.pid'
+RETRAIN_LOG_FILE = 'data/retrain.log'
+
+def count_lines(path):
+    """Count lines in a file without loading it into memory"""
+    try:
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+    except OSError:
+        return 0
+
+_feedback_id_start = count_lines(FEEDBACK_FILE)
+
+def next_local_feedback_id():
+    """Allocate a feedback ID from a counter file locked with flock, shared by workers on this host"""
+    os.makedirs(os.path.dirname(FEEDBACK_ID_FILE), exist_ok=True)
+    with open(os.open(FEEDBACK_ID_FILE, os.O_RDWR | os.O_CREAT, 0o644), 'r+b') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        last = f.read().strip()
+        feedback_id = (int(last) if last else _feedback_id_start) + 1
+        f.seek(0)
+        f.truncate()
+        f.write(str(feedback_id).encode())
+    return feedback_id
+
+def next_feedback_id():
+    """Allocate a feedback ID unique across workers, from Redis when available"""
+    redis_pool = app.extensions.get('redis_pool')
+    if redis_pool is not None:
+        try:
+            pipe = redis.Redis(connection_pool=redis_pool).pipeline()
+            pipe.set(FEEDBACK_ID_KEY, _feedback_id_start, nx=True)
+            pipe.incr(FEEDBACK_ID_KEY)
+            return pipe.execute()[1]
+        except redis.RedisError as e:
+            logger.warning("Failed to allocate feedback ID from Redis: %s. Using local counter.", e)
+
+    return next_local_feedback_id()
+
 # Force load breach data on startup
 try:
     logger.info("Loading breach data on application startup...")
     load_breach_data()
+    app.config['BREACH_COUNT'] = get_breach_count()
     logger.info("Breach data loaded successfully")
 except Exception as e:
-    logger.error(f"Failed to load breach data on startup: {str(e)}")
+    logger.error("Failed to load breach data on startup: %s", e)
+
 
+# Character classes for password validation
+_DIGITS = frozenset(string.digits)
+_UPPER = frozenset(string.ascii_uppercase)
+_LOWER = frozenset(string.ascii_lowercase)
+
+# Test addresses accepted without deliverability checks
+_EXAMPLE_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@example\.com$', re.ASCII)
+
+# Tag-stripping cleaner for free-text fields, built once
+_HTML_CLEANER = bleach.sanitizer.Cleaner(tags=[], attributes={}, strip=True)
+
+# Text made only of these characters comes back from the cleaner unchanged
+_PLAIN_TEXT_CHARS = frozenset('\t\n' + ''.join(map(chr, range(0x20, 0x80)))) - frozenset('<>&')
 
 # Security validation functions
 def sanitize_input(text):
     """Sanitize input to prevent XSS and injection attacks"""
     if not isinstance(text, str):
         return ""
-    return bleach.clean(text, tags=[], attributes={}, strip=True)
+    if _PLAIN_TEXT_CHARS.issuperset(text):
+        return text
+    return _HTML_CLEANER.clean(text)
+
+def sanitize_plain(text):
+    """Sanitize structured, non-HTML input (URLs, emails, passwords)"""
+    if not isinstance(text, str):
+        return ""
+    return text.replace('\x00', '')
+
+# Plain http(s) URLs with an ASCII DNS hostname are accepted without validators.url
+_URL_CHARS = frozenset(string.ascii_letters + string.digits + ":/?@!$&'()*+,;=-._~%")
+_FAST_URL_RE = re.compile(
+    r'https?://(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}(?:[/?]|$)',
+    re.IGNORECASE | re.ASCII
+)
+
+def _fast_url_ok(url):
+    """Cheap syntax check covering the common case; False means 'not sure'"""
+    return (
+        len(url) < 2048
+        and url.startswith(('https://', 'http://'))
+        and _URL_CHARS.issuperset(url)
+        and _FAST_URL_RE.match(url) is not None
+    )
+
+@functools.lru_cache(maxsize=8192)
+def is_valid_url(url):
+    """Check URL syntax, memoized since clients re-check the same pages"""
+    if _fast_url_ok(url):
+        return True
+    try:
+        return bool(validators.url(url))
+    except Exception:
+        return False
 
 def validate_url(url):
     """Validate and normalize URL"""
     if not url or not isinstance(url, str):
         return None, "Invalid URL format"
 
-    url = sanitize_input(url.strip())
+    url = sanitize_plain(url.strip())
     if not url:
         return None, "URL is required"
 
@@ -128,10 +328,7 @@ def validate_url(url):
     url_no_fragment = url.split('#')[0]
 
     # Use validators library for URL validation
-    try:
-        if not validators.url(url_no_fragment):
-            return None, "Invalid URL format"
-    except Exception:
+    if not is_valid_url(url_no_fragment):
         return None, "Invalid URL format"
 
     # Normalize URL (keep original with fragment)
@@ -145,15 +342,14 @@ def validate_email(email):
     if not email or not isinstance(email, str):
         return None, "Invalid email format"
 
-    email = sanitize_input(email.strip())
+    email = sanitize_plain(email.strip())
     if not email:
         return None, "Email is required"
 
     # Allow @example.com emails for testing purposes
     if email.endswith('@example.com'):
         # Basic email format validation for @example.com
-        import re
-        if re.match(r'^[a-zA-Z0-9._%+-]+@example\.com$', email):
+        if _EXAMPLE_EMAIL_RE.match(email):
             return email, None
         else:
             return None, "Invalid email format"
@@ -169,14 +365,25 @@ def validate_password_strength(password):
     if not password or not isinstance(password, str):
         return False, "Password is required"
 
-    password = sanitize_input(password)
+    password = sanitize_plain(password)
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not any(char.isdigit() for char in password):
+
+    chars = set(password)
+    if password.isascii():
+        has_digit = not chars.isdisjoint(_DIGITS)
+        has_upper = not chars.isdisjoint(_UPPER)
+        has_lower = not chars.isdisjoint(_LOWER)
+    else:
+        has_digit = any(char.isdigit() for char in chars)
+        has_upper = any(char.isupper() for char in chars)
+        has_lower = any(char.islower() for char in chars)
+
+    if not has_digit:
         return False, "Password must contain at least one digit"
-    if not any(char.isupper() for char in password):
+    if not has_upper:
         return False, "Password must contain at least one uppercase letter"
-    if not any(char.islower() for char in password):
+    if not has_lower:
         return False, "Password must contain at least one lowercase letter"
 
     return True, None
@@ -195,12 +402,10 @@ def log_security_event(event_type, details, ip_address, user_agent=None, endpoin
 
 def require_api_key(f):
     """Decorator to require API key for endpoints"""
-    from functools import wraps
-
-    @wraps(f)
+    @functools.wraps(f)
     def decorated_function(*args, **kwargs):
-        api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
-        if not api_key or api_key != app.config['API_KEY']:
+        api_key = (request.headers.get('X-API-Key') or request.args.get('api_key') or '').encode()
+        if not api_key or not _API_KEY or not hmac.compare_digest(api_key, _API_KEY):
             log_security_event("INVALID_API_KEY", "Missing or invalid API key", request.remote_addr, request.headers.get('User-Agent'), request.path)
             return jsonify({"error": "Invalid or missing API key"}), 401
         return f(*args, **kwargs)
@@ -208,17 +413,112 @@ def require_api_key(f):
 
 def require_basic_auth(f):
     """Decorator to require basic authentication for admin endpoints"""
-    from functools import wraps
-
-    @wraps(f)
+    @functools.wraps(f)
     def decorated_function(*args, **kwargs):
         auth = request.authorization
-        if not auth or not (auth.username == settings.admin_username and auth.password == settings.admin_password):
+        # Compare both fields (no short-circuit) so timing does not reveal which one matched
+        if not auth or not (hmac.compare_digest((auth.username or '').encode(), _ADMIN_USERNAME)
+                            & hmac.compare_digest((auth.password or '').encode(), _ADMIN_PASSWORD)):
             log_security_event("INVALID_ADMIN_AUTH", "Missing or invalid admin credentials", request.remote_addr, request.headers.get('User-Agent'), request.path)
             return jsonify({"error": "Invalid admin credentials"}), 401
         return f(*args, **kwargs)
     return decorated_function
 
+def stream_jsonl(path, header=None):
+    """Yield a JSONL file as NDJSON, most recent record first"""
+    if header is not None:
+        yield orjson.dumps(header, default=app.json.default, option=ORJSON_OPTIONS) + b'\n'
+    if not os.path.exists(path):
+        return
+    for item in iter_jsonl_reversed(path):
+        yield orjson.dumps(item, default=app.json.default, option=ORJSON_OPTIONS) + b'\n'
+
+def concurrent_limit(f):
+    """Decorator to cap concurrent requests per client for expensive endpoints"""
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = get_remote_address()
+        token = concurrency_limiter.acquire(key)
+        if token is None:
+            log_security_event("CONCURRENCY_LIMIT", "Too many concurrent requests", request.remote_addr, request.headers.get('User-Agent'), request.path)
+            return jsonify({"error": "Too many concurrent requests"}), 429
+        try:
+            return f(*args, **kwargs)
+        finally:
+            concurrency_limiter.release(key, token)
+    return decorated_function
+
+def _capture(func, args):
+    # Errors are handed back to the caller instead of being reported by the hub
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, e
+
+def spawn_checks(calls):
+    """Start {name: (func, args)} service calls on the pool; returns their greenlets by name"""
+    return {name: service_pool.spawn(_capture, func, args) for name, (func, args) in calls.items()}
+
+def collect_checks(greenlets, timeout=None):
+    """Wait for spawned checks; returns (result, error) pairs by name, killing any that overrun"""
+    gevent.joinall(list(greenlets.values()), timeout=timeout)
+    results = {}
+    for name, greenlet in greenlets.items():
+        if greenlet.ready():
+            results[name] = greenlet.value
+        else:
+            greenlet.kill(block=False)
+            results[name] = (None, TimeoutError("Check timed out"))
+    return results
+
+def skipped_network_checks(url):
+    """Stand-in SSL and link results for checks skipped after a decisive URL verdict; the scorer leaves them out"""
+    note = "ℹ️ Skipped - URL check was decisive (use ?deep=1 for a full check)"
+    ssl_results = {
+        "skipped": True,
+        "risk_score": 0,
+        "risk_flags": [note],
+        "connection_type": "unknown"
+    }
+    link_results = {
+        "skipped": True,
+        "final_url": url,
+        "redirect_chain": [],
+        "analysis": {
+            "risk_flags": [note],
+            "risk_score": 0,
+            "suspicious": False
+        },
+        "error": None
+    }
+    return ssl_results, link_results
+
+def run_in_service_pool(func, *args):
+    """Run a blocking service call on the bounded pool and wait for its result"""
+    result, error = service_pool.spawn(_capture, func, args).get()
+    if error is not None:
+        raise error
+    return result
+
+# Popular URLs are checked over and over; reuse recent outcomes for a few minutes
+URL_RESULT_TTL = 300
+
+@cached(ttl=URL_RESULT_TTL)
+def cached_check_url(url):
+    """URL reputation check with results shared across requests"""
+    return check_url(url)
+
+@cached(ttl=URL_RESULT_TTL)
+def cached_check_ssl(url):
+    """SSL check with results shared across requests"""
+    return check_ssl(url)
+
+@cached(ttl=URL_RESULT_TTL)
+def cached_expand_link(url):
+    """Link expansion with results shared across requests"""
+    return expand_link(url)
+
+@cached(ttl=60)
 def parse_analytics_from_logs():
     """Parse analytics data from log files"""
     log_file = settings.log_file
@@ -232,27 +532,11 @@ def parse_analytics_from_logs():
         }
 
     total_checks = 0
-    safe_count = 0
-    caution_count = 0
-    danger_count = 0
-    url_counts = {}
-
     try:
-        with open(log_file, 'r') as f:
-            for line in f:
-                try:
-                    log_entry = json.loads(line.strip())
-                    if log_entry.get('event_type') == 'api_request':
-                        total_checks += 1
-                        endpoint = log_entry.get('endpoint', '')
-                        if 'check-url' in endpoint:
-                            # For URL checks, we don't have risk scores in logs
-                            # This is a limitation; in production, we'd log more details
-                            pass
-                except json.JSONDecodeError:
-                    continue
+        log_index.refresh()
+        total_checks = log_index.total_api_requests
     except Exception as e:
-        logger.error(f"Error parsing log file: {str(e)}")
+        logger.error("Error parsing log file: %s", e)
 
     # For demo purposes, return mock data
     return {
@@ -269,49 +553,34 @@ def parse_analytics_from_logs():
 
 def get_recent_events():
     """Get recent security events from logs"""
-    log_file = settings.log_file
     events = []
 
-    if not os.path.exists(log_file):
+    if not os.path.exists(settings.log_file):
         return events
 
     try:
-        with open(log_file, 'r') as f:
-            lines = f.readlines()[-50:]  # Last 50 lines
-            for line in reversed(lines):
-                try:
-                    log_entry = json.loads(line.strip())
-                    if log_entry.get('event_type') not in ['api_request']:
-                        events.append(log_entry)
-                    if len(events) >= 20:  # Limit to 20 events
-                        break
-                except json.JSONDecodeError:
-                    continue
+        log_index.refresh()
+        for log_entry in reversed(log_index.recent_entries):  # Last 50 lines
+            if log_entry is None:
+                continue
+            if log_entry.get('event_type') not in ['api_request']:
+                events.append(log_entry)
+            if len(events) >= 20:  # Limit to 20 events
+                break
     except Exception as e:
-        logger.error(f"Error reading log file: {str(e)}")
+        logger.error("Error reading log file: %s", e)
 
     return events
 
 def get_breach_statistics():
     """Get breach statistics"""
-    import json
-    try:
-        with open('breaches.json', 'r') as f:
-            breaches = json.load(f)
-            total_breaches = len(breaches)
-            # Mock breached vs safe
-            return {
-                "total_breaches": total_breaches,
-                "breached_count": total_breaches,
-                "safe_count": 1000  # Mock safe count
-            }
-    except Exception as e:
-        logger.error(f"Error reading breaches file: {str(e)}")
-        return {
-            "total_breaches": 0,
-            "breached_count": 0,
-            "safe_count": 0
-        }
+    total_breaches = app.config.get('BREACH_COUNT', 0)
+    # Mock breached vs safe
+    return {
+        "total_breaches": total_breaches,
+        "breached_count": total_breaches,
+        "safe_count": 1000 if total_breaches else 0  # Mock safe count
+    }
 
 def get_user_reports():
     """Get user reports (placeholder)"""
@@ -321,127 +590,48 @@ def get_user_reports():
         "reports": []
     }
 
+@cached(ttl=30)
 def get_user_security_data(user_id, include_detailed=False):
     """Get security dashboard data for a specific user"""
-    log_file = settings.log_file
-    feedback_file = 'data/user_feedback.jsonl'
-
-    # Initialize counters
-    protected_count = 0
-    high_risk_count = 0
-    medium_risk_count = 0
-    low_risk_count = 0
-    weekly_checks = 0
     recent_detections = []
-    security_timeline = []
-    threat_categories = {}
 
     # Current time for filtering
     now = datetime.now()
-    week_ago = now.replace(day=now.day - 7) if now.day > 7 else now.replace(month=now.month - 1, day=28)
+    week_ago = now - timedelta(days=7)
 
     try:
-        # Parse security logs
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                for line in f:
-                    try:
-                        log_entry = json.loads(line.strip())
-
-                        # Check if this log entry is from the user (by user_id or IP)
-                        user_matches = (
-                            log_entry.get('user_id') == user_id or
-                            log_entry.get('ip_address') == user_id or
-                            not user_id
-                        )
-
-                        if user_matches:
-                            event_type = log_entry.get('event_type', '')
-
-                            # Count URL checks
-                            if event_type == 'api_request' and 'check-url' in log_entry.get('endpoint', ''):
-                                protected_count += 1
-
-                                # Check timestamp for weekly count
-                                timestamp_str = log_entry.get('timestamp', '')
-                                if timestamp_str:
-                                    try:
-                                        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                                        if timestamp > week_ago:
-                                            weekly_checks += 1
-                                    except:
-                                        pass
-
-                            # Add to timeline
-                            if event_type in ['api_request', 'security_event']:
-                                security_timeline.append({
-                                    'timestamp': log_entry.get('timestamp', ''),
-                                    'event': f"{event_type}: {log_entry.get('endpoint', 'Unknown')}"
-                                })
-
-                    except json.JSONDecodeError:
-                        continue
-
-        # Parse feedback data for risk analysis
-        if os.path.exists(feedback_file):
-            with open(feedback_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        feedback_item = json.loads(line.strip())
-
-                        # Check if feedback is from this user (multiple identifier fields)
-                        user_matches = (
-                            feedback_item.get('user_id') == user_id or
-                            feedback_item.get('extension_user_id') == user_id or
-                            feedback_item.get('ip_address') == user_id or
-                            not user_id
-                        )
-
-                        if user_matches:
-                            risk_score = feedback_item.get('original_risk_score', 0)
-
-                            # Categorize by risk level
-                            if risk_score >= 70:
-                                high_risk_count += 1
-                            elif risk_score >= 40:
-                                medium_risk_count += 1
-                            else:
-                                low_risk_count += 1
-
-                            # Add to recent detections if recent
-                            timestamp_str = feedback_item.get('timestamp', '')
-                            if timestamp_str:
-                                try:
-                                    timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                                    if timestamp > week_ago:
-                                        recent_detections.append({
-                                            'timestamp': timestamp_str,
-                                            'url': feedback_item.get('url', 'Unknown'),
-                                            'risk_level': 'danger' if risk_score >= 70 else 'caution' if risk_score >= 40 else 'safe'
-                                        })
-                                except:
-                                    pass
-
-                            # Count threat categories
-                            correction = feedback_item.get('user_correction', '')
-                            if correction:
-                                threat_categories[correction] = threat_categories.get(correction, 0) + 1
-
-                    except json.JSONDecodeError:
-                        continue
-
-        # Sort and limit results
-        recent_detections.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        recent_detections = recent_detections[:10]  # Last 10 detections
-
-        security_timeline.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        security_timeline = security_timeline[:20]  # Last 20 events
+        # Aggregates are maintained incrementally by the log index
+        stats = log_index.get_user_stats(user_id)
+
+        # Timestamps are pre-parsed to epoch seconds and served as NumPy columns
+        week_ago_epoch = week_ago.timestamp()
+        weekly_checks = int(np.count_nonzero(stats['check_timestamps'] > week_ago_epoch))
+
+        # Add to recent detections if recent
+        detections = stats['detections']
+        detection_scores = stats['detection_scores']
+        for i in np.flatnonzero(stats['detection_times'] > week_ago_epoch):
+            timestamp_str, url = detections[i]
+            risk_score = detection_scores[i]
+            recent_detections.append({
+                'timestamp': timestamp_str,
+                'url': url,
+                'risk_level': 'danger' if risk_score >= 70 else 'caution' if risk_score >= 40 else 'safe'
+            })
+
+        security_timeline = stats['timeline']
+        threat_categories = stats['threat_categories']
+
+        # Keep only the newest entries without sorting everything
+        by_timestamp = operator.itemgetter('timestamp')
+        recent_detections = heapq.nlargest(10, recent_detections, key=by_timestamp)  # Last 10 detections
+        security_timeline = heapq.nlargest(20, security_timeline, key=by_timestamp)  # Last 20 events
 
         return {
-            "protected_count": protected_count,
-            "high_risk_count": high_risk_count,
-            "medium_risk_count": medium_risk_count,
-            "low_risk_count": low_risk_count,
+            "protected_count": stats['protected_count'],
+            "high_risk_count": stats['high_risk_count'],
+            "medium_risk_count": stats['medium_risk_count'],
+            "low_risk_count": stats['low_risk_count'],
             "weekly_checks": weekly_checks,
             "recent_detections": recent_detections,
             "security_timeline": security_timeline,
@@ -450,7 +640,7 @@ def get_user_security_data(user_id, include_detailed=False):
         }
 
     except Exception as e:
-        logger.error(f"Error getting user security data: {str(e)}")
+        logger.error("Error getting user security data: %s", e)
         return {
             "protected_count": 0,
             "high_risk_count": 0,
@@ -463,26 +653,72 @@ def get_user_security_data(user_id, include_detailed=False):
             "error": "Failed to load security data"
         }
 
+# Recently active dashboard callers, least recent first
+DASHBOARD_REFRESH_USERS = 100
+_active_dashboard_calls = OrderedDict()
+_active_dashboard_lock = threading.Lock()
+# Pid of the process whose refresher thread is running; threads don't survive a gunicorn preload fork
+_dashboard_refresher_pid = None
+
+def track_dashboard_call(user_id, include_detailed=False):
+    """Remember a dashboard caller so its cached data is renewed ahead of expiry"""
+    global _dashboard_refresher_pid
+    key = (user_id, include_detailed)
+    with _active_dashboard_lock:
+        if _dashboard_refresher_pid != os.getpid():
+            _dashboard_refresher_pid = os.getpid()
+            threading.Thread(target=refresh_dashboard_caches, name='dashboard-refresher', daemon=True).start()
+        _active_dashboard_calls[key] = True
+        _active_dashboard_calls.move_to_end(key)
+        while len(_active_dashboard_calls) > DASHBOARD_REFRESH_USERS:
+            _active_dashboard_calls.popitem(last=False)
+
+def refresh_dashboard_caches():
+    """Recompute dashboard data for active users before the cached copies expire"""
+    while True:
+        time.sleep(get_user_security_data.ttl / 2)
+        try:
+            parse_analytics_from_logs.refresh()
+            with _active_dashboard_lock:
+                calls = list(_active_dashboard_calls)
+            for user_id, include_detailed in calls:
+                if include_detailed:
+                    get_user_security_data.refresh(user_id, include_detailed=True)
+                else:
+                    get_user_security_data.refresh(user_id)
+        except Exception as e:
+            logger.error("Error refreshing dashboard caches: %s", e)
+
+# Static endpoint bodies are serialized once; each request only wraps the bytes
+ROOT_BODY = orjson.dumps({
+    "message": "PhisGuard Backend API",
+    "version": "1.0.0",
+    "endpoints": {
+        "health": "/health",
+        "check_url": "/check-url",
+        "check_ssl": "/check-ssl",
+        "expand_link": "/expand-link",
+        "check_breach": "/check-breach",
+        "check_email_text": "/check-email-text",
+        "comprehensive_check": "/comprehensive-check"
+    }
+})
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "phisguard-backend"})
+API_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "phisguard-backend",
+    "api_version": "1.0.0",
+    "cors_enabled": True
+})
+
 @app.route('/', methods=['GET'])
 def root():
-    return jsonify({
-        "message": "PhisGuard Backend API",
-        "version": "1.0.0",
-        "endpoints": {
-            "health": "/health",
-            "check_url": "/check-url",
-            "check_ssl": "/check-ssl",
-            "expand_link": "/expand-link",
-            "check_breach": "/check-breach",
-            "check_email_text": "/check-email-text",
-            "comprehensive_check": "/comprehensive-check"
-        }
-    })
+    return Response(ROOT_BODY, mimetype='application/json')
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Basic health check endpoint"""
-    return jsonify({"status": "healthy", "service": "phisguard-backend"})
+    return Response(HEALTH_BODY, mimetype='application/json')
 
 @app.route('/health/detailed', methods=['GET'])
 def detailed_health_check():
@@ -492,16 +728,12 @@ def detailed_health_check():
 
 @app.route('/api/health', methods=['GET'])
 def api_health_check():
-    return jsonify({
-        "status": "healthy",
-        "service": "phisguard-backend",
-        "api_version": "1.0.0",
-        "cors_enabled": True
-    })
+    return Response(API_HEALTH_BODY, mimetype='application/json')
 
 @app.route('/check-url', methods=['POST'])
 @limiter.limit("10 per minute")
 @require_api_key
+@concurrent_limit
 def check_url_endpoint():
     data = request.get_json()
     if not data:
@@ -523,7 +755,7 @@ def check_url_endpoint():
         return jsonify({"error": error}), 400
 
     try:
-        risk_score, details = check_url(validated_url)
+        risk_score, details = run_in_service_pool(check_url, validated_url)
 
         # Log successful URL check with user ID
         log_security_event("URL_CHECK", f"URL: {validated_url}, Risk: {risk_score}", request.remote_addr, request.headers.get('User-Agent'), request.path, level='INFO', user_id=user_id)
@@ -536,12 +768,13 @@ def check_url_endpoint():
             "recommendation": "safe" if risk_score < 30 else "caution" if risk_score < 70 else "danger"
         })
     except Exception as e:
-        logger.error(f"Error in check_url_endpoint: {str(e)}")
+        logger.error("Error in check_url_endpoint: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/check-ssl', methods=['POST'])
 @limiter.limit("10 per minute")
 @require_api_key
+@concurrent_limit
 def check_ssl_endpoint():
     data = request.get_json()
     if not data:
@@ -560,19 +793,20 @@ def check_ssl_endpoint():
         return jsonify({"error": error}), 400
 
     try:
-        is_valid, details = check_ssl(validated_url)
+        is_valid, details = run_in_service_pool(check_ssl, validated_url)
         return jsonify({
             "url": validated_url,
             "ssl_valid": is_valid,
             "details": details
         })
     except Exception as e:
-        logger.error(f"Error in check_ssl_endpoint: {str(e)}")
+        logger.error("Error in check_ssl_endpoint: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/expand-link', methods=['POST'])
 @limiter.limit("10 per minute")
 @require_api_key
+@concurrent_limit
 def expand_link_endpoint():
     data = request.get_json()
     if not data:
@@ -591,7 +825,7 @@ def expand_link_endpoint():
         return jsonify({"error": error}), 400
 
     try:
-        final_url, redirect_chain, analysis, error = expand_link(validated_url)
+        final_url, redirect_chain, analysis, error = run_in_service_pool(expand_link, validated_url)
         if error:
             # Provide user-friendly error messages
             if "Connection refused" in error or "Failed to establish a new connection" in error:
@@ -617,7 +851,7 @@ def expand_link_endpoint():
             "analysis": analysis
         })
     except Exception as e:
-        logger.error(f"Error in expand_link_endpoint: {str(e)}")
+        logger.error("Error in expand_link_endpoint: %s", e)
         return jsonify({
             "error": "An unexpected error occurred while expanding the link.",
             "url": validated_url
@@ -650,7 +884,7 @@ def check_breach_endpoint():
     # For breach checking, we only validate basic requirements (not full strength)
     # This allows checking if weak passwords have been breached
     if password:
-        password = sanitize_input(password)
+        password = sanitize_plain(password)
         if len(password) < 1:
             return jsonify({"error": "Password cannot be empty"}), 400
         # Skip full strength validation for breach checks - we want to check ALL passwords
@@ -675,7 +909,7 @@ def check_breach_endpoint():
             results = comprehensive_security_check(email, password)
             return jsonify(results)
     except Exception as e:
-        logger.error(f"Error in check_breach_endpoint: {str(e)}")
+        logger.error("Error in check_breach_endpoint: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/check-email-text', methods=['POST'])
@@ -699,7 +933,7 @@ def check_email_text_endpoint():
     body = sanitize_input(body)
 
     try:
-        risk_score, analysis = email_detector.predict(subject, body)
+        risk_score, analysis = email_batcher.predict(subject, body)
 
         return jsonify({
             "subject": subject[:100] + "..." if len(subject) > 100 else subject,  # Truncate for response
@@ -709,7 +943,7 @@ def check_email_text_endpoint():
             "recommendation": "safe" if risk_score < 0.3 else "caution" if risk_score < 0.7 else "danger"
         })
     except Exception as e:
-        logger.error(f"Error in check_email_text_endpoint: {str(e)}")
+        logger.error("Error in check_email_text_endpoint: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/submit-feedback', methods=['POST'])
@@ -747,23 +981,19 @@ def submit_feedback_endpoint():
             'source': 'extension_feedback'
         }
 
-        # Save feedback to file (in production, this would go to a database)
-        feedback_file = 'data/user_feedback.jsonl'
-        os.makedirs(os.path.dirname(feedback_file), exist_ok=True)
-
-        with open(feedback_file, 'a', encoding='utf-8') as f:
-            json.dump(feedback_data, f, ensure_ascii=False)
-            f.write('\n')
+        # Queue feedback for the append-only file (in production, this would go to a database)
+        feedback_writer.write(feedback_data)
 
-        logger.info(f"Feedback saved for URL: {validated_url}")
+        feedback_id = next_feedback_id()
+        logger.info("Feedback saved for URL: %s", validated_url)
 
         return jsonify({
             "message": "Feedback submitted successfully",
-            "feedback_id": len(open(feedback_file).readlines()) if os.path.exists(feedback_file) else 1
+            "feedback_id": feedback_id
         })
 
     except Exception as e:
-        logger.error(f"Error saving feedback: {str(e)}")
+        logger.error("Error saving feedback: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/user/security-dashboard', methods=['GET'])
@@ -772,13 +1002,14 @@ def user_security_dashboard():
     try:
         # Get user identifier from query parameter or fallback to IP
         user_id = request.args.get('user_id') or request.remote_addr
+        track_dashboard_call(user_id)
 
         # Parse security events from logs for this user
         dashboard_data = get_user_security_data(user_id)
 
         return jsonify(dashboard_data)
     except Exception as e:
-        logger.error(f"Error in user_security_dashboard: {str(e)}")
+        logger.error("Error in user_security_dashboard: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/user/security-report', methods=['GET'])
@@ -787,13 +1018,14 @@ def user_security_report():
     try:
         # Get user identifier from query parameter or fallback to IP
         user_id = request.args.get('user_id') or request.remote_addr
+        track_dashboard_call(user_id, include_detailed=True)
 
         # Get comprehensive security data
         report_data = get_user_security_data(user_id, include_detailed=True)
 
         return jsonify(report_data)
     except Exception as e:
-        logger.error(f"Error in user_security_report: {str(e)}")
+        logger.error("Error in user_security_report: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/comprehensive-check', methods=['POST'])
@@ -837,8 +1069,6 @@ def comprehensive_check_endpoint():
             return jsonify({"error": error}), 400
 
     try:
-        scorer = RiskScorer()
-
         # Gather results from all checkers
         url_results = None
         ssl_results = None
@@ -846,58 +1076,94 @@ def comprehensive_check_endpoint():
         breach_results = None
         email_text_results = None
 
+        # Run the independent checks concurrently on the service pool
+        calls = {
+            "url": (cached_check_url, (validated_url,)),
+            "ssl": (cached_check_ssl, (validated_url,)),
+            "link": (cached_expand_link, (validated_url,))
+        }
+
+        # Breach check (if credentials provided)
+        if email or password:
+            calls["breach"] = (comprehensive_security_check, (email, password))
+
+        # Email text check (if email content provided)
+        if email_subject or email_body:
+            email_subject = sanitize_input(email_subject or '')
+            email_body = sanitize_input(email_body or '')
+            calls["email_text"] = (email_batcher.predict, (email_subject, email_body))
+
+        deadline = time.monotonic() + COMPREHENSIVE_CHECK_TIMEOUT
+        greenlets = spawn_checks(calls)
+
         # URL check
-        url_risk, url_details = check_url(validated_url)
+        url_check, error = collect_checks({"url": greenlets.pop("url")}, timeout=COMPREHENSIVE_CHECK_TIMEOUT)["url"]
+        if error is not None:
+            raise error
+        url_risk, url_details = url_check
         url_results = {
             "risk_score": url_risk,
             "details": url_details,
             "recommendation": "safe" if url_risk < 30 else "caution" if url_risk < 70 else "danger"
         }
 
+        # A decisive URL verdict makes the SSL handshake and redirect walk redundant (?deep=1 forces them)
+        if request.args.get('deep') != '1' and (url_risk >= DECISIVE_HIGH_RISK or url_risk <= DECISIVE_LOW_RISK):
+            greenlets.pop("ssl").kill(block=False)
+            greenlets.pop("link").kill(block=False)
+            ssl_results, link_results = skipped_network_checks(validated_url)
+
+        results = collect_checks(greenlets, timeout=max(0, deadline - time.monotonic()))
+
         # SSL check
-        try:
-            ssl_valid, ssl_details = check_ssl(validated_url)
-            ssl_results = {"is_valid": ssl_valid, **ssl_details}
-        except Exception as e:
-            logger.error(f"SSL check failed for {validated_url}: {str(e)}")
-            ssl_results = {
-                "error": "SSL check failed - rate limit or service unavailable",
-                "risk_score": 0,
-                "risk_flags": ["⚠️ SSL analysis temporarily unavailable"],
-                "connection_type": "unknown"
-            }
+        if "ssl" in results:
+            ssl_check, error = results["ssl"]
+            if error is None:
+                ssl_valid, ssl_details = ssl_check
+                ssl_results = {"is_valid": ssl_valid, **ssl_details}
+            else:
+                logger.error("SSL check failed for %s: %s", validated_url, error)
+                ssl_results = {
+                    "error": "SSL check failed - rate limit or service unavailable",
+                    "risk_score": 0,
+                    "risk_flags": ["⚠️ SSL analysis temporarily unavailable"],
+                    "connection_type": "unknown"
+                }
 
         # Link expansion check
-        try:
-            final_url, redirect_chain, link_analysis, link_error = expand_link(validated_url)
-            link_results = {
-                "final_url": final_url,
-                "redirect_chain": redirect_chain,
-                "analysis": link_analysis,
-                "error": link_error
-            }
-        except Exception as e:
-            logger.error(f"Link expansion failed for {validated_url}: {str(e)}")
-            link_results = {
-                "error": "Link expansion failed - rate limit or service unavailable",
-                "final_url": validated_url,
-                "redirect_chain": [],
-                "analysis": {
-                    "risk_flags": ["⚠️ Link analysis temporarily unavailable"],
-                    "risk_score": 0,
-                    "suspicious": False
+        if "link" in results:
+            link_check, error = results["link"]
+            if error is None:
+                final_url, redirect_chain, link_analysis, link_error = link_check
+                link_results = {
+                    "final_url": final_url,
+                    "redirect_chain": redirect_chain,
+                    "analysis": link_analysis,
+                    "error": link_error
+                }
+            else:
+                logger.error("Link expansion failed for %s: %s", validated_url, error)
+                link_results = {
+                    "error": "Link expansion failed - rate limit or service unavailable",
+                    "final_url": validated_url,
+                    "redirect_chain": [],
+                    "analysis": {
+                        "risk_flags": ["⚠️ Link analysis temporarily unavailable"],
+                        "risk_score": 0,
+                        "suspicious": False
+                    }
                 }
-            }
 
-        # Breach check (if credentials provided)
-        if email or password:
-            breach_results = comprehensive_security_check(email, password)
+        if "breach" in results:
+            breach_results, error = results["breach"]
+            if error is not None:
+                raise error
 
-        # Email text check (if email content provided)
-        if email_subject or email_body:
-            email_subject = sanitize_input(email_subject or '')
-            email_body = sanitize_input(email_body or '')
-            email_risk, email_analysis = email_detector.predict(email_subject, email_body)
+        if "email_text" in results:
+            email_check, error = results["email_text"]
+            if error is not None:
+                raise error
+            email_risk, email_analysis = email_check
             email_text_results = {
                 "risk_score": email_risk,
                 "analysis": email_analysis,
@@ -905,7 +1171,7 @@ def comprehensive_check_endpoint():
             }
 
         # Calculate overall risk
-        assessment = scorer.calculate_overall_risk(
+        assessment = SCORER.calculate_overall_risk(
             url_results=url_results,
             ssl_results=ssl_results,
             link_results=link_results,
@@ -913,20 +1179,21 @@ def comprehensive_check_endpoint():
             email_text_results=email_text_results
         )
 
-        return jsonify({
-            "url": validated_url,
-            "assessment": assessment,
-            "individual_checks": {
-                "url_check": url_results,
-                "ssl_check": ssl_results,
-                "link_expansion": link_results,
-                "breach_check": breach_results,
-                "email_text_check": email_text_results
-            }
-        })
+        response = Response(encode_check_response(
+            validated_url,
+            assessment,
+            url_check=url_results,
+            ssl_check=ssl_results,
+            link_expansion=link_results,
+            breach_check=breach_results,
+            email_text_check=email_text_results
+        ), mimetype='application/json')
+        # Let the client reuse the result briefly; it may contain per-user breach data
+        response.headers['Cache-Control'] = 'private, max-age=60'
+        return response
 
     except Exception as e:
-        logger.error(f"Error in comprehensive_check_endpoint: {str(e)}")
+        logger.error("Error in comprehensive_check_endpoint: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 # Admin Dashboard Routes
@@ -944,7 +1211,7 @@ def admin_analytics():
         analytics = parse_analytics_from_logs()
         return jsonify(analytics)
     except Exception as e:
-        logger.error(f"Error in admin_analytics: {str(e)}")
+        logger.error("Error in admin_analytics: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/admin/api/events', methods=['GET'])
@@ -955,7 +1222,7 @@ def admin_events():
         events = get_recent_events()
         return jsonify({"events": events})
     except Exception as e:
-        logger.error(f"Error in admin_events: {str(e)}")
+        logger.error("Error in admin_events: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/admin/api/breaches', methods=['GET'])
@@ -966,7 +1233,7 @@ def admin_breaches():
         breaches = get_breach_statistics()
         return jsonify(breaches)
     except Exception as e:
-        logger.error(f"Error in admin_breaches: {str(e)}")
+        logger.error("Error in admin_breaches: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/admin/api/reports', methods=['GET'])
@@ -977,7 +1244,7 @@ def admin_reports():
         reports = get_user_reports()
         return jsonify(reports)
     except Exception as e:
-        logger.error(f"Error in admin_reports: {str(e)}")
+        logger.error("Error in admin_reports: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/admin/api/feedback', methods=['GET'])
@@ -985,27 +1252,21 @@ def admin_reports():
 def admin_feedback():
     """Get user feedback data"""
     try:
-        feedback_file = 'data/user_feedback.jsonl'
-        feedback_data = []
+        if request.args.get('stream') == '1':
+            return Response(stream_with_context(stream_jsonl(FEEDBACK_FILE)), mimetype='application/x-ndjson')
 
-        if os.path.exists(feedback_file):
-            with open(feedback_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        feedback_item = json.loads(line.strip())
-                        feedback_data.append(feedback_item)
-                    except json.JSONDecodeError:
-                        continue
+        feedback_data = []
 
-        # Sort by timestamp (most recent first)
-        feedback_data.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        # Feedback is append-only, so reading backwards gives most recent first
+        if os.path.exists(FEEDBACK_FILE):
+            feedback_data = list(iter_jsonl_reversed(FEEDBACK_FILE))
 
         return jsonify({
             "total_feedback": len(feedback_data),
             "feedback": feedback_data
         })
     except Exception as e:
-        logger.error(f"Error in admin_feedback: {str(e)}")
+        logger.error("Error in admin_feedback: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/admin/api/models/status', methods=['GET'])
@@ -1013,9 +1274,6 @@ def admin_feedback():
 def admin_model_status():
     """Get current model status and versions"""
     try:
-        from services.ml_detector import detector
-        from services.email_text_detector import email_detector
-
         # Get URL model info
         url_versions = detector.list_versions()
         url_current = detector.current_version
@@ -1026,19 +1284,7 @@ def admin_model_status():
         email_current = email_detector.current_version
         email_loaded = email_detector.model is not None
 
-        # Get training history
-        training_history = []
-        metadata_file = 'data/training_metadata.jsonl'
-        if os.path.exists(metadata_file):
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        training_history.append(json.loads(line.strip()))
-                    except json.JSONDecodeError:
-                        continue
-            training_history.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-
-        return jsonify({
+        model_status = {
             "url_model": {
                 "current_version": url_current,
                 "loaded": url_loaded,
@@ -1048,11 +1294,19 @@ def admin_model_status():
                 "current_version": email_current,
                 "loaded": email_loaded,
                 "available_versions": email_versions
-            },
-            "training_history": training_history[:10]  # Last 10 training sessions
-        })
+            }
+        }
+
+        # Stream the full training history after a status line
+        if request.args.get('stream') == '1':
+            return Response(stream_with_context(stream_jsonl(TRAINING_METADATA_FILE, header=model_status)),
+                            mimetype='application/x-ndjson')
+
+        # Training history is appended in order, so the file tail holds the most recent sessions
+        model_status["training_history"] = tail_jsonl(TRAINING_METADATA_FILE, 10)  # Last 10 training sessions
+        return jsonify(model_status)
     except Exception as e:
-        logger.error(f"Error in admin_model_status: {str(e)}")
+        logger.error("Error in admin_model_status: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/admin/api/models/switch', methods=['POST'])
@@ -1071,11 +1325,9 @@ def admin_switch_model():
             return jsonify({"error": "model_type and version are required"}), 400
 
         if model_type == 'url':
-            from services.ml_detector import detector
             success = detector.switch_version(version)
             model_name = "URL model"
         elif model_type == 'email':
-            from services.email_text_detector import email_detector
             success = email_detector.switch_version(version)
             model_name = "Email model"
         else:
@@ -1091,7 +1343,7 @@ def admin_switch_model():
             return jsonify({"error": f"Failed to switch {model_name} to version '{version}'"}), 500
 
     except Exception as e:
-        logger.error(f"Error in admin_switch_model: {str(e)}")
+        logger.error("Error in admin_switch_model: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/admin/api/models/retrain', methods=['POST'])
@@ -1099,48 +1351,59 @@ def admin_switch_model():
 def admin_retrain_model():
     """Trigger model retraining"""
     try:
-        import subprocess
-        import threading
-
-        def run_retraining():
-            """Run retraining in background"""
-            try:
-                result = subprocess.run([
-                    'python3', 'scripts/retrain_model.py'
-                ], capture_output=True, text=True, cwd='.')
-
-                logger.info(f"Retraining completed: {result.returncode}")
-                if result.stdout:
-                    logger.info(f"Retraining stdout: {result.stdout}")
-                if result.stderr:
-                    logger.error(f"Retraining stderr: {result.stderr}")
-
-            except Exception as e:
-                logger.error(f"Error in background retraining: {str(e)}")
-
-        # Start retraining in background
-        thread = threading.Thread(target=run_retraining, daemon=True)
-        thread.start()
+        # Only one retrain across all workers: the lock is inherited by the child and held until it exits
+        os.makedirs(os.path.dirname(RETRAIN_PID_FILE), exist_ok=True)
+        lock_file = open(RETRAIN_PID_FILE, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return jsonify({"error": "Model retraining is already running"}), 409
 
+        try:
+            with open(RETRAIN_LOG_FILE, 'ab') as retrain_log:
+                # Fire and forget; output goes to a file instead of being buffered in memory
+                process = subprocess.Popen(
+                    [sys.executable, 'scripts/retrain_model.py'],
+                    stdout=retrain_log,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    cwd='.',
+                    start_new_session=True,
+                    pass_fds=(lock_file.fileno(),)
+                )
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(str(process.pid))
+            lock_file.flush()
+        finally:
+            lock_file.close()
+
+        # Reap the child when it exits so it doesn't linger as a zombie in this worker
+        threading.Thread(target=process.wait, name='retrain-reaper', daemon=True).start()
+        logger.info("Retraining started with pid %s", process.pid)
         return jsonify({
             "message": "Model retraining started in background",
-            "status": "running"
+            "status": "running",
+            "pid": process.pid
         })
 
     except Exception as e:
-        logger.error(f"Error starting retraining: {str(e)}")
+        logger.error("Error starting retraining: %s", e)
         return jsonify({"error": "Failed to start retraining"}), 500
 
 @app.before_request
 def before_request():
     """Log incoming requests and start timing"""
-    request.start_time = time.time()
+    request.start_time_ns = time.perf_counter_ns()
 
 @app.after_request
 def after_request(response):
     """Log response details and timing"""
-    if hasattr(request, 'start_time'):
-        duration = time.time() - request.start_time
+    # Requests rejected by an earlier hook (e.g. the rate limiter) never get a start time
+    start_time_ns = getattr(request, 'start_time_ns', None)
+    if start_time_ns is not None and security_logger.logger.isEnabledFor(logging.INFO):
+        duration = (time.perf_counter_ns() - start_time_ns) / 1e9
         security_logger.log_api_request(
             method=request.method,
             endpoint=request.path,
@@ -1150,28 +1413,18 @@ def after_request(response):
             duration=duration
         )
 
-    # Handle CORS
-    origin = request.headers.get('Origin', '')
-    response.headers['Access-Control-Allow-Origin'] = origin or '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, X-API-Key'
-    response.headers['Access-Control-Allow-Credentials'] = 'true'
-
     return response
 
 @app.errorhandler(500)
 def handle_internal_error(error):
     """Handle internal server errors with detailed logging"""
-    error_details = {
-        "error_type": "InternalServerError",
-        "message": str(error),
-        "traceback": traceback.format_exc()
-    }
+    # Walking and formatting the stack is only done when it is shown to the client
+    error_traceback = traceback.format_exc() if app.config['DEBUG'] else None
 
     security_logger.log_error(
         error_type="InternalServerError",
         message=str(error),
-        traceback=traceback.format_exc(),
+        exc_info=error,
         ip_address=getattr(request, 'remote_addr', 'Unknown'),
         endpoint=getattr(request, 'path', 'Unknown')
     )
@@ -1181,7 +1434,11 @@ def handle_internal_error(error):
         return jsonify({
             "error": "Internal server error",
             "message": "An unexpected error occurred",
-            "details": error_details
+            "details": {
+                "error_type": "InternalServerError",
+                "message": str(error),
+                "traceback": error_traceback
+            }
         }), 500
     else:
         return jsonify({
@@ -1235,16 +1492,12 @@ def handle_rate_limit_exceeded(error):
 @app.errorhandler(Exception)
 def handle_unexpected_error(error):
     """Catch-all handler for unexpected errors"""
-    error_details = {
-        "error_type": type(error).__name__,
-        "message": str(error),
-        "traceback": traceback.format_exc()
-    }
+    error_traceback = traceback.format_exc() if app.config['DEBUG'] else None
 
     security_logger.log_error(
         error_type="UnexpectedError",
         message=str(error),
-        traceback=traceback.format_exc(),
+        exc_info=error,
         ip_address=getattr(request, 'remote_addr', 'Unknown'),
         endpoint=getattr(request, 'path', 'Unknown')
     )
@@ -1253,7 +1506,11 @@ def handle_unexpected_error(error):
         return jsonify({
             "error": "Unexpected error",
             "message": "An unexpected error occurred",
-            "details": error_details
+            "details": {
+                "error_type": type(error).__name__,
+                "message": str(error),
+                "traceback": error_traceback
+            }
         }), 500
     else:
         return jsonify({
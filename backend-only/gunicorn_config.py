@@ -5,12 +5,17 @@ Gunicorn Production Configuration for PhisGuard
 import multiprocessing
 import os
 
+# One BLAS/OpenMP thread per worker; set before preload imports numpy/scikit-learn
+for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(var, '1')
+
 # Server socket
 bind = "0.0.0.0:5000"
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
+# ML scoring is CPU-bound, so one worker per core; gevent overlaps the outbound checks
+workers = multiprocessing.cpu_count()
 worker_class = "gevent"
 worker_connections = 1000
 timeout = 30
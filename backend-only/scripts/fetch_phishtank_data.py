@@ -6,12 +6,21 @@ Script to fetch phishing data from PhishTank API and prepare it for model traini
 import requests
 import json
 import pandas as pd
+import numpy as np
 import time
 import os
 import sys
+import itertools
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
 import logging
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -20,6 +29,26 @@ from services.feature_extractor import extract_features
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _safe_extract_features(url: str):
+    """Worker-side feature extraction; returns (features, error) so one bad URL doesn't abort the pool"""
+    try:
+        return extract_features(url), None
+    except Exception as e:
+        return None, str(e)
+
+URL_COLUMNS = ('url', 'source', 'submission_time', 'verified', 'verification_time', 'online', 'target', 'details')
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ('source', 'verified', 'online', 'target')
+
+def build_url_frame(columns: dict, label: int) -> pd.DataFrame:
+    """Assemble a labelled URL DataFrame from per-column lists; scalar values fill the whole column."""
+    n = len(columns.get('url', ()))
+    df = pd.DataFrame({name: columns.get(name, '') for name in URL_COLUMNS}, index=pd.RangeIndex(n))
+    df.insert(1, 'label', np.full(n, label, dtype=np.int8))
+    for name in CATEGORICAL_COLUMNS:
+        df[name] = pd.Categorical(df[name])
+    return df
+
 class PhishTankFetcher:
     """Fetch phishing data from PhishTank API."""
 
@@ -41,46 +70,46 @@ class PhishTankFetcher:
         logger.info("Fetching phishing data from PhishTank...")
 
         try:
-            response = requests.get(self.api_url, timeout=30)
+            response = requests.get(self.api_url, timeout=30, stream=True)
             response.raise_for_status()
 
-            data = response.json()
-            logger.info(f"Retrieved {len(data)} phishing entries from PhishTank")
-
-            # Convert to DataFrame
-            df = pd.DataFrame(data)
-
-            # Filter and clean data
-            if len(df) > max_urls:
-                df = df.head(max_urls)
+            if IJSON_AVAILABLE:
+                # Stream-parse the feed and stop at max_urls instead of materializing all of it
+                response.raw.decode_content = True
+                entries = itertools.islice(ijson.items(response.raw, 'item'), max_urls)
+            else:
+                data = response.json()
+                logger.info(f"Retrieved {len(data)} phishing entries from PhishTank")
+                entries = data[:max_urls]
 
-            # Extract relevant columns
-            phishing_data = []
-            for _, row in df.iterrows():
+            # Extract relevant columns as row tuples; transposed into columns once at the end
+            phishing_rows = []
+            for entry in entries:
                 try:
-                    url = row.get('url', '')
+                    url = entry.get('url', '')
                     if url:
-                        phishing_data.append({
-                            'url': url,
-                            'label': 1,  # 1 = phishing
-                            'source': 'phishtank',
-                            'submission_time': row.get('submission_time', ''),
-                            'verified': row.get('verified', ''),
-                            'verification_time': row.get('verification_time', ''),
-                            'online': row.get('online', ''),
-                            'target': row.get('target', ''),
-                            'details': json.dumps({
-                                'phish_id': row.get('phish_id', ''),
-                                'phish_detail_url': row.get('phish_detail_url', ''),
-                                'submission_time': row.get('submission_time', ''),
-                                'verification_time': row.get('verification_time', ''),
-                            })
-                        })
+                        phishing_rows.append((
+                            url,
+                            'phishtank',
+                            entry.get('submission_time', ''),
+                            entry.get('verified', ''),
+                            entry.get('verification_time', ''),
+                            entry.get('online', ''),
+                            entry.get('target', ''),
+                            json.dumps({
+                                'phish_id': entry.get('phish_id', ''),
+                                'phish_detail_url': entry.get('phish_detail_url', ''),
+                                'submission_time': entry.get('submission_time', ''),
+                                'verification_time': entry.get('verification_time', ''),
+                            }, default=str)
+                        ))
                 except Exception as e:
                     logger.warning(f"Error processing PhishTank entry: {e}")
                     continue
+            response.close()
 
-            phishing_df = pd.DataFrame(phishing_data)
+            columns = dict(zip(URL_COLUMNS, map(list, zip(*phishing_rows)))) if phishing_rows else {}
+            phishing_df = build_url_frame(columns, label=1)  # 1 = phishing
             logger.info(f"Processed {len(phishing_df)} phishing URLs")
             return phishing_df
 
@@ -106,45 +135,36 @@ class PhishTankFetcher:
             'aws.amazon.com', 'azure.microsoft.com', 'cloud.google.com'
         ]
 
-        legitimate_data = []
-        for domain in legitimate_domains:
-            # Generate various URL patterns
-            urls = [
-                f'https://{domain}',
-                f'https://{domain}/login',
-                f'https://{domain}/account',
-                f'https://{domain}/profile',
-                f'https://{domain}/settings',
-                f'https://www.{domain}',
-                f'https://www.{domain}/about',
-                f'https://www.{domain}/contact'
-            ]
-
-            for url in urls:
-                legitimate_data.append({
-                    'url': url,
-                    'label': 0,  # 0 = legitimate
-                    'source': 'legitimate',
-                    'submission_time': datetime.now().isoformat(),
-                    'verified': 'yes',
-                    'verification_time': datetime.now().isoformat(),
-                    'online': 'yes',
-                    'target': domain,
-                    'details': json.dumps({'generated': True})
-                })
-
-                if len(legitimate_data) >= count:
-                    break
-            if len(legitimate_data) >= count:
-                break
-
-        legitimate_df = pd.DataFrame(legitimate_data[:count])
+        # Generate various URL patterns per domain, stopping once count is reached
+        url_patterns = (
+            ('https://', ''), ('https://', '/login'), ('https://', '/account'), ('https://', '/profile'),
+            ('https://', '/settings'), ('https://www.', ''), ('https://www.', '/about'), ('https://www.', '/contact')
+        )
+        urls = [f'{scheme}{domain}{path}' for domain in legitimate_domains for scheme, path in url_patterns][:count]
+        targets = [domain for domain in legitimate_domains for _ in url_patterns][:count]
+        now = datetime.now().isoformat()
+
+        # Constant columns are passed as scalars and broadcast by pandas
+        legitimate_df = build_url_frame({
+            'url': urls,
+            'source': 'legitimate',
+            'submission_time': now,
+            'verified': 'yes',
+            'verification_time': now,
+            'online': 'yes',
+            'target': targets,
+            'details': json.dumps({'generated': True})
+        }, label=0)  # 0 = legitimate
         logger.info(f"Generated {len(legitimate_df)} legitimate URLs")
         return legitimate_df
 
     def combine_datasets(self, phishing_df: pd.DataFrame, legitimate_df: pd.DataFrame) -> pd.DataFrame:
         """Combine phishing and legitimate datasets."""
         combined_df = pd.concat([phishing_df, legitimate_df], ignore_index=True)
+        # concat falls back to object dtype when the category sets differ
+        for name in CATEGORICAL_COLUMNS:
+            if name in combined_df.columns:
+                combined_df[name] = combined_df[name].astype('category')
         combined_df = combined_df.sample(frac=1, random_state=42).reset_index(drop=True)  # Shuffle
         return combined_df
 
@@ -160,22 +180,30 @@ class PhishTankFetcher:
         """
         logger.info(f"Extracting features from {len(df)} URLs...")
 
+        # Pull whole columns once instead of materializing a Series per row
+        total = len(df)
+        urls = df['url'].astype(str).tolist()
+        labels = df['label'].astype(int).tolist()
+        sources = df['source'].tolist() if 'source' in df.columns else ['unknown'] * total
+
+        # extract_features is CPU-bound and independent per URL, so fan it out across cores;
+        # chunksize amortizes the pickling round-trip per task
+        chunksize = max(16, total // ((os.cpu_count() or 1) * 4))
         feature_data = []
-        for idx, row in df.iterrows():
-            try:
-                url = str(row['url'])
-                features = extract_features(url)
-                features['label'] = int(row['label'])
-                features['original_url'] = url
-                features['source'] = row.get('source', 'unknown')
-                feature_data.append(features)
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(_safe_extract_features, urls, chunksize=chunksize)
+            for idx, ((features, error), label, source) in enumerate(zip(results, labels, sources)):
+                if error is not None:
+                    logger.warning(f"Failed to extract features for URL {idx}: {error}")
+                    continue
 
-                if (idx + 1) % 100 == 0:
-                    logger.info(f"Processed {idx + 1}/{len(df)} URLs")
+                features['label'] = label
+                features['original_url'] = urls[idx]
+                features['source'] = source
+                feature_data.append(features)
 
-            except Exception as e:
-                logger.warning(f"Failed to extract features for URL {idx}: {e}")
-                continue
+                if idx % 100 == 99:
+                    logger.info(f"Processed {idx + 1}/{total} URLs")
 
         feature_df = pd.DataFrame(feature_data)
         logger.info(f"Successfully extracted features for {len(feature_df)} URLs")
@@ -238,10 +266,14 @@ def main():
         print("\n" + "="*60)
         print("DATASET STATISTICS")
         print("="*60)
-        print(f"Total samples: {len(training_df)}")
-        print(f"Phishing samples: {len(training_df[training_df['label'] == 1])}")
-        print(f"Legitimate samples: {len(training_df[training_df['label'] == 0])}")
-        print(".2%")
+        total = len(training_df)
+        label_counts = training_df['label'].value_counts()
+        phishing_count = int(label_counts.get(1, 0))
+        legitimate_count = int(label_counts.get(0, 0))
+        print(f"Total samples: {total}")
+        print(f"Phishing samples: {phishing_count}")
+        print(f"Legitimate samples: {legitimate_count}")
+        print(f"Phishing ratio: {phishing_count / total if total else 0:.2%}")
 
         # Save raw URLs for reference
         raw_urls_df = training_df[['original_url', 'label', 'source']].copy()
@@ -79,6 +79,12 @@ def load_breach_data():
         traceback.print_exc()
         breach_data = []
 
+def get_breach_count() -> int:
+    """
+    Number of records in the loaded breach dataset.
+    """
+    return len(breach_data) if breach_data else 0
+
 def check_email_breach(email: str) -> Tuple[bool, int, List[str], Optional[str]]:
     """
     Check if email has been involved in known data breaches using local dataset.
@@ -1,16 +1,24 @@
 import os
+import copy
+import math
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.utils import murmurhash3_32
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 from typing import Dict, Any, Optional, Tuple, List
 import logging
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Label set declared up front so partial_fit can see chunks missing a class
+_CLASSES = np.array([0, 1])
+
 class EmailTextDetector:
     """
     Machine Learning-based phishing email text detector using Naïve Bayes with TF-IDF.
@@ -24,7 +32,8 @@ class EmailTextDetector:
         self.base_vectorizer_path = vectorizer_path
         self.current_version = version
         self.model: Optional[MultinomialNB] = None
-        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.vectorizer: Optional[HashingVectorizer] = None
+        self._top_phishing_indicators: List[str] = []
         self.versions_dir = 'models/versions'
         os.makedirs(self.versions_dir, exist_ok=True)
         self.load_model()
@@ -34,8 +43,12 @@ class EmailTextDetector:
         try:
             model_path, vectorizer_path = self._get_model_paths()
             if os.path.exists(model_path) and os.path.exists(vectorizer_path):
-                self.model = joblib.load(model_path)
-                self.vectorizer = joblib.load(vectorizer_path)
+                # Map the uncompressed 'latest' arrays read-only so worker processes share the pages;
+                # prediction only reads them. Compressed version backups can't be mapped.
+                mmap_mode = 'r' if self.current_version == 'latest' else None
+                self.model = joblib.load(model_path, mmap_mode=mmap_mode)
+                self.vectorizer = joblib.load(vectorizer_path, mmap_mode=mmap_mode)
+                self._cache_top_indicators()
                 logger.info(f"Loaded email text model version '{self.current_version}' from {model_path}")
                 return True
             else:
@@ -45,6 +58,39 @@ class EmailTextDetector:
             logger.error(f"Error loading email text model: {e}")
             return False
 
+    def _top_feature_indices(self, k: int = 10) -> np.ndarray:
+        """Column indices of the k features most indicative of phishing, strongest first."""
+        feature_importance = self.model.feature_log_prob_[1] - self.model.feature_log_prob_[0]
+        # Partition out the top k in O(V), then order just those
+        k = min(k, len(feature_importance))
+        candidates = np.argpartition(feature_importance, -k)[-k:]
+        return candidates[np.argsort(-feature_importance[candidates])]
+
+    def _cache_top_indicators(self) -> None:
+        """Precompute the strongest phishing terms; they depend only on the fitted model."""
+        if hasattr(self.model, 'top_phishing_indicators_'):
+            # Hashed features have no vocabulary, so the terms are resolved at training time
+            self._top_phishing_indicators = list(self.model.top_phishing_indicators_)
+            return
+        # Models saved before the hashing vectorizer carry a TfidfVectorizer vocabulary
+        feature_names = self.vectorizer.get_feature_names_out()
+        top_features = [feature_names[i] for i in self._top_feature_indices() if i < len(feature_names)]
+        self._top_phishing_indicators = top_features[:5]  # Top 5 for brevity
+
+    def _collect_hashed_terms(self, texts, terms_by_index: Dict[int, str]) -> None:
+        """Record a training term for each hashed column; bounded by n_features entries."""
+        analyzer = self.vectorizer.build_analyzer()
+        n_features = self.vectorizer.n_features
+        for text in texts:
+            for term in analyzer(text):
+                # Same bucketing as HashingVectorizer with alternate_sign=False
+                terms_by_index.setdefault(abs(murmurhash3_32(term, seed=0)) % n_features, term)
+
+    def _top_hashed_indicators(self, terms_by_index: Dict[int, str]) -> List[str]:
+        """Map the top hashed feature columns back to the training terms that produced them."""
+        top_indices = self._top_feature_indices()
+        return [terms_by_index[i] for i in top_indices if i in terms_by_index][:5]  # Top 5 for brevity
+
     def _get_model_paths(self) -> tuple:
         """Get the model and vectorizer paths based on version."""
         if self.current_version == 'latest':
@@ -97,8 +143,9 @@ class EmailTextDetector:
             model_path = os.path.join(version_dir, 'email_text_model.pkl')
             vectorizer_path = os.path.join(version_dir, 'email_text_vectorizer.pkl')
 
-            joblib.dump(self.model, model_path)
-            joblib.dump(self.vectorizer, vectorizer_path)
+            # Version backups are only loaded on rollback, so trade load speed for disk space
+            joblib.dump(self.model, model_path, compress=3)
+            joblib.dump(self.vectorizer, vectorizer_path, compress=3)
             logger.info(f"Saved email model as version '{version}' to {version_dir}")
             return True
         except Exception as e:
@@ -115,12 +162,15 @@ class EmailTextDetector:
         text = ' '.join(text.split())
         return text
 
-    def train_model(self, data_path: str = 'email_training_data.csv') -> Dict[str, Any]:
+    def train_model(self, data_path: str = 'email_training_data.csv', incremental: bool = False,
+                    chunksize: int = 10000) -> Dict[str, Any]:
         """
         Train the ML model using the provided dataset.
 
         Args:
             data_path: Path to CSV file with columns: text, label (0=legitimate, 1=phishing)
+            incremental: Continue training the loaded model on this data instead of starting over
+            chunksize: Number of rows read and fitted at a time
 
         Returns:
             Dictionary with training results
@@ -128,64 +178,91 @@ class EmailTextDetector:
         try:
             logger.info(f"Loading training data from {data_path}")
 
-            # Load data
-            df = pd.read_csv(data_path)
-
-            # Check if data has the expected structure
-            if 'text' not in df.columns or 'label' not in df.columns:
-                raise ValueError("Training data must have 'text' and 'label' columns")
+            # Only a model fitted on the same hashed feature space can be trained further
+            can_continue = isinstance(self.vectorizer, HashingVectorizer) and self.model is not None
 
-            # Preprocess texts
-            df['processed_text'] = df['text'].apply(self.preprocess_text)
-
-            # Prepare features and labels
-            X = df['processed_text']
-            y = df['label']
-
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
-            )
-
-            logger.info(f"Training on {len(X_train)} samples, testing on {len(X_test)} samples")
-
-            # Create and fit vectorizer
-            self.vectorizer = TfidfVectorizer(
-                max_features=5000,
+            # The hashing vectorizer is stateless, so the model can be fitted chunk by chunk
+            self.vectorizer = HashingVectorizer(
+                n_features=2 ** 15,
                 ngram_range=(1, 2),
-                stop_words='english'
+                stop_words='english',
+                alternate_sign=False
             )
-
-            X_train_tfidf = self.vectorizer.fit_transform(X_train)
-            X_test_tfidf = self.vectorizer.transform(X_test)
-
-            # Train model
-            self.model = MultinomialNB()
-            self.model.fit(X_train_tfidf, y_train)
+            if incremental and can_continue:
+                # Loaded arrays are memory-mapped read-only; partial_fit needs a writable copy
+                model = copy.deepcopy(self.model)
+                previous_indicators = list(model.top_phishing_indicators_)
+            else:
+                model = MultinomialNB()
+                previous_indicators = []
+
+            terms_by_index = {}
+            self._collect_hashed_terms(previous_indicators, terms_by_index)
+            test_matrices, test_labels = [], []
+            training_samples = 0
+
+            for chunk in pd.read_csv(data_path, chunksize=chunksize):
+                # Check if data has the expected structure
+                if 'text' not in chunk.columns or 'label' not in chunk.columns:
+                    raise ValueError("Training data must have 'text' and 'label' columns")
+
+                # Preprocess texts with vectorized string ops; same result as preprocess_text,
+                # non-string cells come out as NaN and are blanked
+                X = chunk['text'].astype(object).str.lower().str.split().str.join(' ').fillna('')
+                y = chunk['label']
+
+                # Split data, holding out the same share of every chunk; a chunk too small to leave
+                # one row per class on each side (e.g. a short tail chunk) is used for training only
+                n_classes = y.nunique()
+                n_test = math.ceil(0.2 * len(y))
+                if n_test < n_classes or len(y) - n_test < n_classes:
+                    X_train, y_train, X_test = X, y, None
+                else:
+                    stratify = y if y.value_counts().min() >= 2 else None
+                    X_train, X_test, y_train, y_test = train_test_split(
+                        X, y, test_size=0.2, random_state=42, stratify=stratify
+                    )
+
+                model.partial_fit(self.vectorizer.transform(X_train), y_train, classes=_CLASSES)
+                self._collect_hashed_terms(X_train, terms_by_index)
+                if X_test is not None:
+                    test_matrices.append(self.vectorizer.transform(X_test))
+                    test_labels.append(y_test.to_numpy())
+                training_samples += len(X_train)
+
+            if not test_matrices:
+                raise ValueError("Training data is too small to hold out a test set")
+
+            X_test_hashed = sp.vstack(test_matrices)
+            y_test = np.concatenate(test_labels)
+            logger.info(f"Trained on {training_samples} samples, testing on {len(y_test)} samples")
+
+            self.model = model
+            self.model.top_phishing_indicators_ = self._top_hashed_indicators(terms_by_index)
+            self._cache_top_indicators()
 
             # Evaluate
-            y_pred = self.model.predict(X_test_tfidf)
+            y_pred = self.model.predict(X_test_hashed)
             accuracy = accuracy_score(y_test, y_pred)
             report = classification_report(y_test, y_pred, output_dict=True)
 
             logger.info(f"Model accuracy: {accuracy:.4f}")
 
-            # Save model and vectorizer
-            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            joblib.dump(self.model, self.model_path)
-            joblib.dump(self.vectorizer, self.vectorizer_path)
-            logger.info(f"Saved model to {self.model_path} and vectorizer to {self.vectorizer_path}")
+            # Save model and vectorizer uncompressed so workers can memory-map the arrays
+            os.makedirs(os.path.dirname(self.base_model_path), exist_ok=True)
+            joblib.dump(self.model, self.base_model_path)
+            joblib.dump(self.vectorizer, self.base_vectorizer_path)
+            logger.info(f"Saved model to {self.base_model_path} and vectorizer to {self.base_vectorizer_path}")
 
             # Create a versioned backup
-            from datetime import datetime
             version = datetime.now().strftime("%Y%m%d_%H%M%S")
             self.save_version(version)
 
             return {
                 'accuracy': accuracy,
                 'classification_report': report,
-                'training_samples': len(X_train),
-                'test_samples': len(X_test),
+                'training_samples': training_samples,
+                'test_samples': len(y_test),
                 'version': version
             }
 
@@ -204,45 +281,53 @@ class EmailTextDetector:
         Returns:
             Tuple of (phishing_probability, analysis_dict)
         """
+        return self.predict_batch([subject], [body])[0]
+
+    def predict_batch(self, subjects: List[str], bodies: List[str]) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Predict phishing probability for several emails with one vectorizer/model call.
+
+        Args:
+            subjects: Email subject lines
+            bodies: Email body texts, aligned with subjects
+
+        Returns:
+            List of (phishing_probability, analysis_dict) tuples, one per email
+        """
         if self.model is None or self.vectorizer is None:
             logger.warning("No email text model loaded, returning neutral score")
-            return 0.5, {"error": "Model not loaded"}
+            return [(0.5, {"error": "Model not loaded"}) for _ in subjects]
 
         try:
             # Combine subject and body
-            full_text = f"{subject} {body}"
-            processed_text = self.preprocess_text(full_text)
+            processed_texts = [self.preprocess_text(f"{subject} {body}") for subject, body in zip(subjects, bodies)]
 
-            # Vectorize
-            text_tfidf = self.vectorizer.transform([processed_text])
+            # Vectorize the whole batch into one sparse matrix
+            text_tfidf = self.vectorizer.transform(processed_texts)
 
             # Get prediction probabilities
-            probabilities = self.model.predict_proba(text_tfidf)[0]
-
-            # Return probability of phishing (assuming 1 = phishing)
-            phishing_prob = float(probabilities[1])
+            probabilities = self.model.predict_proba(text_tfidf)
 
-            # Get top features for analysis
-            feature_names = self.vectorizer.get_feature_names_out()
-            feature_importance = self.model.feature_log_prob_[1] - self.model.feature_log_prob_[0]
+            # Pull both columns out as Python floats in one pass instead of per-row NumPy scalar conversions
+            phishing_probs = probabilities[:, 1].tolist()  # assuming 1 = phishing
+            confidences = probabilities.max(axis=1).tolist()
 
-            # Get top phishing indicators
-            top_indices = np.argsort(feature_importance)[-10:][::-1]  # Top 10
-            top_features = [feature_names[i] for i in top_indices if i < len(feature_names)]
-
-            analysis = {
-                "phishing_probability": phishing_prob,
-                "confidence": float(max(probabilities)),
-                "top_phishing_indicators": top_features[:5],  # Top 5 for brevity
-                "processed_text_length": len(processed_text),
-                "risk_level": "low" if phishing_prob < 0.3 else "medium" if phishing_prob < 0.7 else "high"
-            }
+            results = []
+            for processed_text, phishing_prob, confidence in zip(processed_texts, phishing_probs, confidences):
+                analysis = {
+                    "phishing_probability": phishing_prob,
+                    "confidence": confidence,
+                    "top_phishing_indicators": list(self._top_phishing_indicators),
+                    "processed_text_length": len(processed_text),
+                    "risk_level": "low" if phishing_prob < 0.3 else "medium" if phishing_prob < 0.7 else "high"
+                }
+                results.append((phishing_prob, analysis))
 
-            return phishing_prob, analysis
+            return results
 
         except Exception as e:
             logger.error(f"Error making email text prediction: {e}")
-            return 0.5, {"error": str(e)}
+            return [(0.5, {"error": str(e)}) for _ in subjects]
 
 # Global instance
 email_detector = EmailTextDetector()
\ No newline at end of file
@@ -1,30 +1,114 @@
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 import os
+import time
 
 # Load configuration from environment variables
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", 10))
 MAX_REDIRECTS = int(os.getenv("MAX_REDIRECTS", 10))
-
-def expand_link(url: str, max_redirects: int = None):
-    if max_redirects is None:
-        max_redirects = MAX_REDIRECTS
+EXPAND_CACHE_TTL = int(os.getenv("EXPAND_CACHE_TTL", 300))
+
+# Redirect targets using these schemes execute or embed content instead of navigating
+_BAD_SCHEMES = ('javascript:', 'data:', 'vbscript:')
+
+_SHORTENER_DOMAINS = frozenset({
+    'bit.ly', 'tinyurl.com', 'goo.gl', 't.co', 'ow.ly', 'is.gd',
+    'buff.ly', 'adf.ly', 'tiny.cc', 'cli.gs', 'su.pr', 'wp.me',
+    'post.ly', 'snipurl.com', 'snurl.com', 'snip.ly', 'tr.im',
+    'fb.me', 'lnkd.in', 'db.tt', 'qr.ae', '1url.com', 'tweez.me',
+    'v.gd', 'bc.vc', 'u.to', 'j.mp', 'buzurl.com', 'cur.lv',
+    'yourls.org', 'x.co', 'prettylinkpro.com', 'scrnch.me',
+    'filoops.info', 'vzturl.com', 'qr.net', '1link.in',
+    'sharein.com', 'easyurl.net', 'tu.pw', 'cut.by'
+})
+
+class _SharedAdapter(HTTPAdapter):
+    """HTTPAdapter that outlives the sessions it is mounted on; Session.close() leaves the pool open"""
+
+    def close(self):
+        pass
+
+# One connection pool shared by every expansion so repeat hits on a shortener reuse keep-alive connections.
+# 32 per-host pools of up to 64 sockets each; failures surface immediately rather than being retried
+_ADAPTER = _SharedAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+
+# Batches tend to share shortener hosts and redirect hops, so memoize parsing
+_urlparse = lru_cache(maxsize=4096)(urlparse)
+
+@lru_cache(maxsize=4096)
+def _domain_tail(domain: str) -> str:
+    """Last two labels of a domain, e.g. 'login.example.com' -> 'example.com'"""
+    return '.'.join(domain.split('.')[-2:])
+
+def _new_session(max_redirects: int) -> requests.Session:
+    """Create a session for one expansion on top of the shared pool.
+    Sessions are never shared, so cookies set by one user's redirects can't reach another's requests"""
+    session = requests.Session()
+    session.max_redirects = max_redirects
+    session.mount('https://', _ADAPTER)
+    session.mount('http://', _ADAPTER)
+    return session
+
+class _UncachedResult(Exception):
+    """Carries a failed expansion out of the cached helper so lru_cache doesn't store it"""
+
+    def __init__(self, result):
+        self.result = result
+
+
+@lru_cache(maxsize=4096)
+def _expand_link_cached(url: str, max_redirects: int, only_shorteners: bool, ttl_bucket: int):
+    # ttl_bucket only varies the key so entries go stale after EXPAND_CACHE_TTL; old buckets age out of the LRU
+    result = _expand_link_impl(url, max_redirects, only_shorteners)
+    if result[3] is not None:
+        raise _UncachedResult(result)
+    return result
+
+
+def expand_link(url: str, max_redirects: int = None, only_shorteners: bool = False):
     """
     Expand a shortened URL by following redirects with enhanced analysis.
+    With only_shorteners, URLs not on a known shortener are returned as-is without a request.
+    Successful expansions are cached for up to EXPAND_CACHE_TTL seconds; failures are retried.
     Returns (final_url, redirect_chain, analysis, error)
     """
+    if max_redirects is None:
+        max_redirects = MAX_REDIRECTS
+    try:
+        return _expand_link_cached(url, max_redirects, only_shorteners, int(time.monotonic() // EXPAND_CACHE_TTL))
+    except _UncachedResult as e:
+        return e.result
+
+
+def clear_cache():
+    """Drop all cached expansions"""
+    _expand_link_cached.cache_clear()
+
+
+def _expand_link_impl(url: str, max_redirects: int, only_shorteners: bool):
+    """Follow redirects for url without caching; see expand_link"""
     try:
         # Validate URL format
-        parsed = urlparse(url)
+        parsed = _urlparse(url)
         if not parsed.scheme or not parsed.netloc:
             return None, [], {}, "Invalid URL format"
 
         original_domain = parsed.netloc.lower()
 
+        if only_shorteners and not is_shortened_url(url):
+            return url, [], analyze_redirect_chain(url, url, [], original_domain), None
+
         try:
-            with requests.Session() as session:
-                session.max_redirects = max_redirects
-                response = session.get(url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+            with _new_session(max_redirects) as session:
+                # Only the redirect chain is needed, so try HEAD first and skip downloading the body
+                response = session.head(url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+                if response.status_code in (405, 501) or (not response.history and response.status_code >= 400):
+                    # HEAD rejected; fall back to GET but close before reading any content
+                    response = session.get(url, allow_redirects=True, timeout=REQUEST_TIMEOUT, stream=True)
+                    response.close()
 
             # Build redirect chain from history
             redirect_chain = []
@@ -55,40 +139,38 @@ def expand_link(url: str, max_redirects: int = None):
         return None, [], {}, f"Unexpected error: {str(e)}"
 
 
+def expand_links(urls, workers: int = 20, only_shorteners: bool = False):
+    """
+    Expand many URLs concurrently over the shared connection pool.
+    Returns a list of expand_link results in input order.
+    """
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(partial(expand_link, only_shorteners=only_shorteners), urls))
+
+
 def analyze_redirect_chain(original_url: str, final_url: str, redirect_chain: list, original_domain: str):
     """
     Analyze the redirect chain for security risks and format display data.
     """
+    # Visual redirect chain: the original URL followed by each hop's target
+    visual_chain = [original_url]
+    visual_chain.extend(f"→ {redirect['redirect_to']}" for redirect in redirect_chain)
+
     analysis = {
-        'visual_chain': [],
+        'visual_chain': visual_chain,
         'risk_flags': [],
         'suspicious': False,
         'risk_score': 0
     }
 
-    # Build visual redirect chain
-    current_url = original_url
-    analysis['visual_chain'].append(current_url)
-
-    for redirect in redirect_chain:
-        analysis['visual_chain'].append(f"→ {redirect['redirect_to']}")
-        current_url = redirect['redirect_to']
-
     # Analyze final URL domain
-    final_parsed = urlparse(final_url)
+    final_parsed = _urlparse(final_url)
     final_domain = final_parsed.netloc.lower()
 
     # Check for domain mismatch (big difference)
     if original_domain != final_domain:
-        # Extract main domain parts
-        orig_parts = original_domain.split('.')
-        final_parts = final_domain.split('.')
-
-        # Remove common prefixes/suffixes for comparison
-        orig_main = '.'.join(orig_parts[-2:]) if len(orig_parts) >= 2 else original_domain
-        final_main = '.'.join(final_parts[-2:]) if len(final_parts) >= 2 else final_domain
-
-        if orig_main != final_main:
+        # Compare main domains, ignoring subdomain prefixes
+        if _domain_tail(original_domain) != _domain_tail(final_domain):
             analysis['risk_flags'].append("⚠️ Domain mismatch - final domain differs significantly from original")
             analysis['risk_score'] += 15
             analysis['suspicious'] = True
@@ -112,14 +194,14 @@ def analyze_redirect_chain(original_url: str, final_url: str, redirect_chain: li
 
     # Check for suspicious redirect patterns
     for redirect in redirect_chain:
-        redirect_url = redirect['redirect_to'].lower()
-        if any(suspicious in redirect_url for suspicious in ['javascript:', 'data:', 'vbscript:']):
+        redirect_url = redirect['redirect_to'].lstrip().lower()
+        if redirect_url.startswith(_BAD_SCHEMES):
             analysis['risk_flags'].append("🚨 Malicious redirect pattern detected")
             analysis['risk_score'] += 30
             analysis['suspicious'] = True
 
     # Format visual chain as single string
-    analysis['formatted_chain'] = ' '.join(analysis['visual_chain'])
+    analysis['formatted_chain'] = ' '.join(visual_chain)
 
     return analysis
 
@@ -127,23 +209,8 @@ def is_shortened_url(url: str):
     """
     Check if URL is from a known URL shortener service.
     """
-    shortener_domains = {
-        'bit.ly', 'tinyurl.com', 'goo.gl', 't.co', 'ow.ly', 'is.gd',
-        'buff.ly', 'adf.ly', 'tiny.cc', 'cli.gs', 'su.pr', 'wp.me',
-        'post.ly', 'snipurl.com', 'snurl.com', 'snip.ly', 'tr.im',
-        'fb.me', 'lnkd.in', 'db.tt', 'qr.ae', '1url.com', 'tweez.me',
-        'v.gd', 'bc.vc', 'u.to', 'j.mp', 'buzurl.com', 'cur.lv',
-        'yourls.org', 'x.co', 'prettylinkpro.com', 'scrnch.me',
-        'filoops.info', 'vzturl.com', 'qr.net', '1link.in',
-        'sharein.com', 'easyurl.net', 'tu.pw', 'cut.by'
-    }
-
     try:
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        if domain.startswith('www.'):
-            domain = domain[4:]
-
-        return domain in shortener_domains
-    except:
+        domain = _urlparse(url).netloc.lower().removeprefix('www.')
+        return domain in _SHORTENER_DOMAINS
+    except ValueError:
         return False
@@ -1,5 +1,8 @@
 import os
-import pandas as pd
+import csv
+import pickle
+import tempfile
+import warnings
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
@@ -7,9 +10,45 @@ from sklearn.metrics import accuracy_score, classification_report
 import joblib
 from typing import Dict, Any, Optional, List
 import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import onnxruntime as ort
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# Optional compiled-tree backend, used when ONNX Runtime is not installed (needs a C toolchain)
+try:
+    import treelite
+    import tl2cgen
+    TREELITE_AVAILABLE = True
+except ImportError:
+    TREELITE_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Below this many rows a threaded forest predict costs more in joblib setup than it saves
+PARALLEL_PREDICT_MIN_ROWS = 512
+
+@contextmanager
+def _replacing(path: str):
+    """
+    Yield a temporary path beside path; once the block succeeds it is renamed over path,
+    so workers building the same artifact concurrently never load a half-written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1], dir=os.path.dirname(path) or '.')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 class PhishingDetector:
     """
     Machine Learning-based phishing URL detector using Random Forest.
@@ -20,6 +59,8 @@ class PhishingDetector:
         self.base_model_path = model_path
         self.current_version = version
         self.model: Optional[RandomForestClassifier] = None
+        self.session = None  # ONNX Runtime session compiled from self.model, when available
+        self.tl_predictor = None  # Treelite-compiled predictor, used when there is no ONNX session
         self.feature_names = [
             'url_length', 'domain_length', 'subdomain_length', 'tld_length',
             'path_length', 'query_length', 'num_dots', 'num_hyphens',
@@ -27,6 +68,7 @@ class PhishingDetector:
             'num_percent', 'num_digits', 'has_https', 'kw_login',
             'kw_secure', 'kw_update', 'kw_verify', 'kw_payment', 'kw_account'
         ]
+        self._fill_row = self._compile_row_filler(self.feature_names)
         self.versions_dir = 'models/versions'
         os.makedirs(self.versions_dir, exist_ok=True)
         self.load_model()
@@ -36,7 +78,13 @@ class PhishingDetector:
         try:
             model_path = self._get_model_path()
             if os.path.exists(model_path):
-                self.model = joblib.load(model_path)
+                self.model = self._read_model(model_path)
+                # Saved models keep the training-time n_jobs=-1; thread-pool setup would dominate small predicts.
+                # None runs single-threaded unless _predict_matrix opens a joblib context for a large batch
+                self.model.n_jobs = None
+                # The model was fitted on a DataFrame; predict_many feeds it a bare ndarray in the same column order
+                warnings.filterwarnings('ignore', message='X does not have valid feature names', category=UserWarning)
+                self._load_compiled_predictors(model_path)
                 logger.info(f"Loaded ML model version '{self.current_version}' from {model_path}")
                 return True
             else:
@@ -46,6 +94,81 @@ class PhishingDetector:
             logger.error(f"Error loading ML model: {e}")
             return False
 
+    @staticmethod
+    def _read_model(model_path: str) -> RandomForestClassifier:
+        """Load a pickled model, falling back to joblib for files written by older versions."""
+        try:
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)
+        except pickle.UnpicklingError:
+            model = None
+        # Uncompressed joblib files unpickle without error but yield only a wrapper array
+        if not isinstance(model, RandomForestClassifier):
+            model = joblib.load(model_path)
+        return model
+
+    def _write_model(self, model_path: str) -> None:
+        """Pickle the current model with protocol 5."""
+        with open(model_path, 'wb') as f:
+            pickle.dump(self.model, f, protocol=5)
+
+    @staticmethod
+    def _compile_row_filler(feature_names: List[str]):
+        """
+        Generate fill(features, row) for this fixed schema: one straight-line tuple of
+        .get calls assigned into a (1, n_features) array, with no per-name loop.
+        """
+        values = ', '.join(f"features.get({name!r}, 0.0)" for name in feature_names)
+        namespace = {}
+        exec(f"def fill(features, row):\n    row[0] = ({values},)\n", namespace)
+        return namespace['fill']
+
+    def _load_compiled_predictors(self, model_path: str) -> None:
+        """Set up the fastest available inference backend for the loaded model."""
+        self.session = self._load_onnx_session(model_path)
+        self.tl_predictor = None if self.session is not None else self._load_treelite_predictor(model_path)
+
+    def _load_treelite_predictor(self, model_path: str):
+        """Compile the forest to a shared library with Treelite, caching it beside the pkl."""
+        if not TREELITE_AVAILABLE:
+            return None
+
+        try:
+            lib_path = os.path.splitext(model_path)[0] + '.so'
+            if not os.path.exists(lib_path) or os.path.getmtime(lib_path) < os.path.getmtime(model_path):
+                tl_model = treelite.sklearn.import_model(self.model)
+                with _replacing(lib_path) as tmp_path:
+                    tl2cgen.export_lib(tl_model, toolchain='gcc', libpath=tmp_path, params={'parallel_comp': 4})
+            return tl2cgen.Predictor(lib_path, nthread=1)
+        except Exception as e:
+            logger.warning(f"Treelite compilation failed, using scikit-learn for inference: {e}")
+            return None
+
+    def _load_onnx_session(self, model_path: str):
+        """Build an ONNX Runtime session for the loaded model, converting and caching it beside the pkl."""
+        if not ONNX_AVAILABLE:
+            return None
+
+        try:
+            onnx_path = os.path.splitext(model_path)[0] + '.onnx'
+            if not os.path.exists(onnx_path) or os.path.getmtime(onnx_path) < os.path.getmtime(model_path):
+                onnx_model = convert_sklearn(
+                    self.model,
+                    initial_types=[('input', FloatTensorType([None, len(self.feature_names)]))],
+                    options={id(self.model): {'zipmap': False}}  # plain probability tensor, not a list of dicts
+                )
+                with _replacing(onnx_path) as tmp_path, open(tmp_path, 'wb') as f:
+                    f.write(onnx_model.SerializeToString())
+
+            # Single-row requests gain nothing from intra-op threads; the workers already run one per core
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = 1
+            options.inter_op_num_threads = 1
+            return ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        except Exception as e:
+            logger.warning(f"ONNX conversion failed, using scikit-learn for inference: {e}")
+            return None
+
     def _get_model_path(self) -> str:
         """Get the model path based on version."""
         if self.current_version == 'latest':
@@ -89,7 +212,7 @@ class PhishingDetector:
 
             version_path = os.path.join(self.versions_dir, f"phishing_model_{version}.pkl")
             os.makedirs(os.path.dirname(version_path), exist_ok=True)
-            joblib.dump(self.model, version_path)
+            self._write_model(version_path)
             logger.info(f"Saved model as version '{version}' to {version_path}")
             return True
         except Exception as e:
@@ -109,25 +232,28 @@ class PhishingDetector:
         try:
             logger.info(f"Loading training data from {data_path}")
 
-            # Load data
-            df = pd.read_csv(data_path)
+            # Only the header is parsed as text; the feature and label columns load straight into one float32 array
+            with open(data_path, newline='') as f:
+                header = next(csv.reader(f))
 
             # Check if data has the expected structure
-            if 'label' not in df.columns:
+            if 'label' not in header:
                 raise ValueError("Training data must have a 'label' column")
 
-            # Prepare features and labels
-            X = df.drop('label', axis=1)
-            y = df['label']
-
             # Ensure we have the right features
-            missing_features = set(self.feature_names) - set(X.columns)
+            missing_features = set(self.feature_names) - set(header)
             if missing_features:
                 raise ValueError(f"Missing features in training data: {missing_features}")
 
+            # Prepare features and labels
+            columns = [header.index(name) for name in self.feature_names] + [header.index('label')]
+            data = np.loadtxt(data_path, delimiter=',', skiprows=1, usecols=columns, quotechar='"', dtype=np.float32, ndmin=2)
+            X = data[:, :-1]
+            y = data[:, -1].astype(np.int8)
+
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(
-                X[self.feature_names], y, test_size=0.2, random_state=42, stratify=y
+                X, y, test_size=0.2, random_state=42, stratify=y
             )
 
             logger.info(f"Training on {len(X_train)} samples, testing on {len(X_test)} samples")
@@ -143,6 +269,7 @@ class PhishingDetector:
             )
 
             self.model.fit(X_train, y_train)
+            self.model.n_jobs = None
 
             # Evaluate
             y_pred = self.model.predict(X_test)
@@ -154,11 +281,11 @@ class PhishingDetector:
             # Save model
             model_path = self._get_model_path()
             os.makedirs(os.path.dirname(model_path), exist_ok=True)
-            joblib.dump(self.model, model_path)
+            self._write_model(model_path)
+            self._load_compiled_predictors(model_path)
             logger.info(f"Saved model to {model_path}")
 
             # Create a versioned backup
-            from datetime import datetime
             version = datetime.now().strftime("%Y%m%d_%H%M%S")
             self.save_version(version)
 
@@ -189,21 +316,61 @@ class PhishingDetector:
             return 0.5
 
         try:
-            # Convert features dict to DataFrame with proper column names to avoid sklearn warnings
-            import pandas as pd
-            feature_df = pd.DataFrame([features], columns=self.feature_names)
+            X = np.empty((1, len(self.feature_names)), dtype=np.float32)
+            self._fill_row(features, X)
+            return float(self._predict_matrix(X)[0])
+        except Exception as e:
+            logger.error(f"Error making prediction: {e}")
+            return 0.5
+
+    def predict_many(self, features_list: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Predict phishing probabilities for several URLs with one model call.
 
-            # Get prediction probabilities
-            probabilities = self.model.predict_proba(feature_df)[0]
+        Args:
+            features_list: Feature dictionaries, one per URL
 
-            # Return probability of phishing (assuming 1 = phishing)
-            phishing_prob = probabilities[1]
+        Returns:
+            Array of phishing probabilities (0.0 to 1.0), aligned with features_list
+        """
+        if not features_list:
+            return np.empty(0)
 
-            return float(phishing_prob)
+        if self.model is None:
+            logger.warning("No ML model loaded, returning neutral score")
+            return np.full(len(features_list), 0.5)
 
+        try:
+            # Fill one feature column at a time (SoA) and hand the predictors the
+            # column-major (N, 21) view; features are log-scaled, so they stay float32
+            columns = np.empty((len(self.feature_names), len(features_list)), dtype=np.float32)
+            for j, name in enumerate(self.feature_names):
+                columns[j] = [features.get(name, 0.0) for features in features_list]
+            return self._predict_matrix(columns.T)
         except Exception as e:
             logger.error(f"Error making prediction: {e}")
-            return 0.5
+            return np.full(len(features_list), 0.5)
+
+    def _predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Score a float32 feature matrix with the fastest loaded backend."""
+        if self.session is not None:
+            return self.session.run(['probabilities'], {'input': X})[0][:, 1]
+
+        if self.tl_predictor is not None:
+            # Output is (rows, targets, classes)
+            return self.tl_predictor.predict(tl2cgen.DMatrix(X))[:, 0, 1]
+
+        # Columns are already in training order, so the ndarray goes in directly.
+        # Fan trees out over threads only when the batch is big enough to pay for the pool;
+        # the joblib context is local to this thread, so concurrent small predicts stay serial
+        if len(X) >= PARALLEL_PREDICT_MIN_ROWS:
+            with joblib.parallel_backend('threading', n_jobs=-1):
+                probabilities = self.model.predict_proba(X)
+        else:
+            probabilities = self.model.predict_proba(X)
+
+        # Return probability of phishing (assuming 1 = phishing)
+        return probabilities[:, 1]
 
     def get_feature_importance(self) -> Optional[Dict[str, float]]:
         """Get feature importance from the trained model."""
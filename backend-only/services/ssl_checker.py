@@ -1,12 +1,30 @@
+import re
 import ssl
 import socket
-from datetime import datetime, timezone
+import copy
+import time
+import calendar
 import urllib.parse
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from utils.cache import cached
 
 # Load configuration from environment variables
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", 10))
 SSL_VERIFY_CERTIFICATES = os.getenv("SSL_VERIFY_CERTIFICATES", "True").lower() == "true"
+SSL_WORKERS = int(os.getenv("SSL_WORKERS", 16))
+
+# Built once so the system CA bundle is parsed at import rather than per check
+_SSL_CONTEXT = ssl.create_default_context()
+if not SSL_VERIFY_CERTIFICATES:
+    _SSL_CONTEXT.check_hostname = False
+    _SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+# Shared by check_ssl_many; handshakes block in recv with the GIL released,
+# so throughput scales with hostname count up to SSL_WORKERS
+_EXEC = ThreadPoolExecutor(max_workers=SSL_WORKERS, thread_name_prefix="ssl-check")
 
 # Known Certificate Authorities (subset of major CAs)
 KNOWN_CAS = {
@@ -15,15 +33,30 @@ KNOWN_CAS = {
     "Trustwave", "StartCom", "WoSign", "Symantec", "Network Solutions",
     "Amazon", "Google Trust Services", "Microsoft", "Apple", "Mozilla"
 }
+# One alternation over the lowercased names, matched against lowercased issuer fields
+_KNOWN_CA_RE = re.compile("|".join(re.escape(ca.lower()) for ca in sorted(KNOWN_CAS)))
+
+_MONTHS = {name: number for number, name in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1
+)}
+
+def cert_time_to_epoch(cert_time: str) -> int:
+    """
+    Convert an OpenSSL notBefore/notAfter string ("Jan  5 09:34:43 2026 GMT") to epoch seconds.
+    Splits the fixed layout directly instead of going through strptime.
+    """
+    try:
+        month, day, clock, year, _ = cert_time.split()
+        hour, minute, second = clock.split(":")
+        return calendar.timegm((int(year), _MONTHS[month], int(day), int(hour), int(minute), int(second)))
+    except (KeyError, ValueError):
+        raise ValueError(f"time data {cert_time!r} is not a certificate timestamp")
 
 def check_ssl(url: str):
     """
     Advanced SSL certificate analysis with expiry alerts, issuer validation, and wildcard detection.
     Returns (is_valid, details_dict)
     """
-    risk_score = 0
-    risk_flags = []
-
     try:
         # Parse URL to get hostname and scheme
         parsed_url = urllib.parse.urlparse(url)
@@ -51,152 +84,182 @@ def check_ssl(url: str):
                 "risk_flags": [f"⚠️ Unsupported protocol: {scheme}"]
             }
 
-        # Create SSL context
-        context = ssl.create_default_context()
-        if not SSL_VERIFY_CERTIFICATES:
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
+        is_valid, details = _check_ssl_host(hostname)
+        # The analysis is shared through the cache, so hand out a private copy
+        return is_valid, copy.deepcopy(details)
 
-        # Connect to the host
-        with socket.create_connection((hostname, 443), timeout=REQUEST_TIMEOUT) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert = ssock.getpeercert()
+    except ssl.SSLError as e:
+        error_msg = f"SSL Error: {str(e)}"
+        return False, {"error": error_msg, "risk_score": 60, "risk_flags": [f"SSL connection failed: {error_msg}"]}
+    except socket.gaierror as e:
+        error_msg = f"DNS Error: {str(e)}"
+        return False, {"error": error_msg, "risk_score": 50, "risk_flags": [f"DNS resolution failed: {error_msg}"]}
+    except Exception as e:
+        error_msg = f"Unexpected error: {str(e)}"
+        return False, {"error": error_msg, "risk_score": 40, "risk_flags": [f"SSL analysis failed: {error_msg}"]}
 
-        if not cert:
-            return False, {
-                "error": "No certificate found",
-                "risk_score": 80,
-                "risk_flags": ["❌ No SSL certificate found"],
-                "connection_type": "https"
-            }
+def check_ssl_many(urls: List[str]) -> list:
+    """
+    Run check_ssl for several URLs concurrently on the shared pool.
+    Returns a list of (is_valid, details_dict) aligned with urls.
+    """
+    return list(_EXEC.map(check_ssl, urls))
 
-        # Extract certificate details
-        subject = dict(x[0] for x in cert.get("subject", []))
-        issuer = dict(x[0] for x in cert.get("issuer", []))
-
-        details = {
-            "subject": subject,
-            "issuer": issuer,
-            "version": cert.get("version"),
-            "not_before": cert.get("notBefore", ""),
-            "not_after": cert.get("notAfter", ""),
-            "connection_type": "https",
-            "risk_score": 0,
-            "risk_flags": []
+@cached(ttl=300)
+def _resolve(hostname: str) -> List[tuple]:
+    """Resolve hostname to every (family, sockaddr) for port 443, cached to skip repeat resolver round trips"""
+    return [(family, sockaddr) for family, _, _, _, sockaddr in socket.getaddrinfo(hostname, 443, type=socket.SOCK_STREAM)]
+
+def _connect(hostname: str) -> socket.socket:
+    """Connect to the cached addresses in resolver order, falling through to the next one on failure"""
+    last_error = None
+    for family, sockaddr in _resolve(hostname):
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(REQUEST_TIMEOUT)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            sock.close()
+            last_error = e
+    raise last_error
+
+@cached(ttl=3600)
+def _check_ssl_host(hostname: str):
+    """
+    Fetch and analyze the certificate served on hostname:443.
+    Results are cached per hostname; connection errors propagate to check_ssl and are not cached.
+    """
+    risk_score = 0
+    risk_flags = []
+
+    # Connect to the pre-resolved addresses; SNI and hostname checks still use the hostname
+    with _connect(hostname) as sock:
+        with _SSL_CONTEXT.wrap_socket(sock, server_hostname=hostname) as ssock:
+            cert = ssock.getpeercert()
+
+    if not cert:
+        return False, {
+            "error": "No certificate found",
+            "risk_score": 80,
+            "risk_flags": ["❌ No SSL certificate found"],
+            "connection_type": "https"
         }
 
-        # === EXPIRY ANALYSIS ===
-        not_after = cert.get("notAfter")
-        if not_after:
-            try:
-                # Parse expiry date (handle timezone properly)
-                expiry_date = datetime.strptime(not_after, "%b %d %H:%M:%S %Y %Z")
-                if expiry_date.tzinfo is None:
-                    expiry_date = expiry_date.replace(tzinfo=timezone.utc)
-
-                current_time = datetime.now(timezone.utc)
-                is_expired = current_time > expiry_date
-
-                if is_expired:
-                    days_expired = (current_time - expiry_date).days
-                    details["is_expired"] = True
-                    details["days_since_expiry"] = days_expired
-                    risk_flags.append(f"🚨 EXPIRED {days_expired} days ago")
+    # Extract certificate details
+    subject = dict(x[0] for x in cert.get("subject", []))
+    issuer = dict(x[0] for x in cert.get("issuer", []))
+
+    details = {
+        "subject": subject,
+        "issuer": issuer,
+        "version": cert.get("version"),
+        "not_before": cert.get("notBefore", ""),
+        "not_after": cert.get("notAfter", ""),
+        "connection_type": "https",
+        "risk_score": 0,
+        "risk_flags": []
+    }
+
+    # === EXPIRY ANALYSIS ===
+    not_after = cert.get("notAfter")
+    if not_after:
+        try:
+            # Compare as epoch seconds; certificate times are always UTC
+            seconds_left = cert_time_to_epoch(not_after) - time.time()
+            is_expired = seconds_left < 0
+
+            if is_expired:
+                days_expired = int(-seconds_left // 86400)
+                details["is_expired"] = True
+                details["days_since_expiry"] = days_expired
+                risk_flags.append(f"🚨 EXPIRED {days_expired} days ago")
+                risk_score += 40
+            else:
+                days_until_expiry = int(seconds_left // 86400)
+                details["is_expired"] = False
+                details["days_until_expiry"] = days_until_expiry
+
+                if days_until_expiry <= 0:
+                    risk_flags.append("🚨 Certificate expired!")
                     risk_score += 40
+                elif days_until_expiry <= 7:
+                    risk_flags.append(f"⚠️ Expires in {days_until_expiry} days - CRITICAL")
+                    risk_score += 30
+                elif days_until_expiry <= 30:
+                    risk_flags.append(f"⚠️ Expires in {days_until_expiry} days - Renew soon")
+                    risk_score += 10
                 else:
-                    days_until_expiry = (expiry_date - current_time).days
-                    details["is_expired"] = False
-                    details["days_until_expiry"] = days_until_expiry
-
-                    if days_until_expiry <= 0:
-                        risk_flags.append("🚨 Certificate expired!")
-                        risk_score += 40
-                    elif days_until_expiry <= 7:
-                        risk_flags.append(f"⚠️ Expires in {days_until_expiry} days - CRITICAL")
-                        risk_score += 30
-                    elif days_until_expiry <= 30:
-                        risk_flags.append(f"⚠️ Expires in {days_until_expiry} days - Renew soon")
-                        risk_score += 10
-                    else:
-                        risk_flags.append(f"✅ Valid for {days_until_expiry} more days")
-            except ValueError as e:
-                risk_flags.append(f"⚠️ Could not parse certificate dates: {e}")
-                risk_score += 5
-
-        # === ISSUER VALIDATION ===
-        subject_common_name = subject.get("commonName", "").lower()
-        issuer_common_name = issuer.get("commonName", "").lower()
-        issuer_org = issuer.get("organizationName", "").lower()
-
-        # Check for self-signed certificates
-        if subject_common_name == issuer_common_name:
-            risk_flags.append("🚨 SELF-SIGNED certificate detected")
-            risk_score += 40
-            details["is_self_signed"] = True
-        else:
-            details["is_self_signed"] = False
-
-        # Check if issuer is in known CAs
-        issuer_known = any(ca.lower() in issuer_org or ca.lower() in issuer_common_name for ca in KNOWN_CAS)
-        if not issuer_known and issuer_org:
-            risk_flags.append(f"⚠️ Unknown Certificate Authority: {issuer_org}")
-            risk_score += 15
-        elif issuer_known:
-            risk_flags.append(f"✅ Issued by trusted CA: {issuer_org}")
-
-        # === WILDCARD CERTIFICATE DETECTION ===
-        if subject_common_name.startswith("*."):
-            risk_flags.append("⚠️ WILDCARD certificate detected - ensure all subdomains are trusted")
-            risk_score += 10
-            details["is_wildcard"] = True
-        else:
-            details["is_wildcard"] = False
-
-        # === ADDITIONAL SECURITY CHECKS ===
-        # Check certificate version (should be 3)
-        cert_version = cert.get("version")
-        if cert_version and cert_version < 3:
-            risk_flags.append("⚠️ Outdated certificate version")
+                    risk_flags.append(f"✅ Valid for {days_until_expiry} more days")
+        except ValueError as e:
+            risk_flags.append(f"⚠️ Could not parse certificate dates: {e}")
             risk_score += 5
 
-        # Check key size (if available)
-        public_key = cert.get("publicKey")
-        if public_key:
-            try:
-                key_size = public_key.key_size
-                if key_size < 2048:
-                    risk_flags.append(f"⚠️ Weak key size: {key_size} bits")
-                    risk_score += 10
-                else:
-                    risk_flags.append(f"✅ Strong key size: {key_size} bits")
-            except:
-                pass  # Key size not available
+    # === ISSUER VALIDATION ===
+    subject_common_name = subject.get("commonName", "").lower()
+    issuer_common_name = issuer.get("commonName", "").lower()
+    issuer_org = issuer.get("organizationName", "").lower()
 
-        # === FINAL RISK ASSESSMENT ===
-        details["risk_score"] = min(risk_score, 100)
-        details["risk_flags"] = risk_flags
+    # Check for self-signed certificates
+    if subject_common_name == issuer_common_name:
+        risk_flags.append("🚨 SELF-SIGNED certificate detected")
+        risk_score += 40
+        details["is_self_signed"] = True
+    else:
+        details["is_self_signed"] = False
 
-        # Overall validity assessment
-        is_valid = risk_score < 30  # Valid if risk score is low
+    # Check if issuer is in known CAs
+    issuer_known = bool(_KNOWN_CA_RE.search(issuer_org) or _KNOWN_CA_RE.search(issuer_common_name))
+    if not issuer_known and issuer_org:
+        risk_flags.append(f"⚠️ Unknown Certificate Authority: {issuer_org}")
+        risk_score += 15
+    elif issuer_known:
+        risk_flags.append(f"✅ Issued by trusted CA: {issuer_org}")
 
-        # Add risk level interpretation
-        if risk_score >= 70:
-            risk_flags.insert(0, "🔴 HIGH RISK - Major SSL issues detected")
-        elif risk_score >= 40:
-            risk_flags.insert(0, "🟡 MEDIUM RISK - SSL concerns present")
-        elif risk_score >= 20:
-            risk_flags.insert(0, "🟢 LOW RISK - Minor SSL issues")
-        else:
-            risk_flags.insert(0, "🟢 VERY LOW RISK - SSL appears secure")
+    # === WILDCARD CERTIFICATE DETECTION ===
+    if subject_common_name.startswith("*."):
+        risk_flags.append("⚠️ WILDCARD certificate detected - ensure all subdomains are trusted")
+        risk_score += 10
+        details["is_wildcard"] = True
+    else:
+        details["is_wildcard"] = False
 
-        return is_valid, details
+    # === ADDITIONAL SECURITY CHECKS ===
+    # Check certificate version (should be 3)
+    cert_version = cert.get("version")
+    if cert_version and cert_version < 3:
+        risk_flags.append("⚠️ Outdated certificate version")
+        risk_score += 5
+
+    # Check key size (if available)
+    public_key = cert.get("publicKey")
+    if public_key:
+        try:
+            key_size = public_key.key_size
+            if key_size < 2048:
+                risk_flags.append(f"⚠️ Weak key size: {key_size} bits")
+                risk_score += 10
+            else:
+                risk_flags.append(f"✅ Strong key size: {key_size} bits")
+        except:
+            pass  # Key size not available
+
+    # === FINAL RISK ASSESSMENT ===
+    details["risk_score"] = min(risk_score, 100)
+    details["risk_flags"] = risk_flags
+
+    # Overall validity assessment
+    is_valid = risk_score < 30  # Valid if risk score is low
+
+    # Add risk level interpretation
+    if risk_score >= 70:
+        risk_flags.insert(0, "🔴 HIGH RISK - Major SSL issues detected")
+    elif risk_score >= 40:
+        risk_flags.insert(0, "🟡 MEDIUM RISK - SSL concerns present")
+    elif risk_score >= 20:
+        risk_flags.insert(0, "🟢 LOW RISK - Minor SSL issues")
+    else:
+        risk_flags.insert(0, "🟢 VERY LOW RISK - SSL appears secure")
+
+    return is_valid, details
 
-    except ssl.SSLError as e:
-        error_msg = f"SSL Error: {str(e)}"
-        return False, {"error": error_msg, "risk_score": 60, "risk_flags": [f"SSL connection failed: {error_msg}"]}
-    except socket.gaierror as e:
-        error_msg = f"DNS Error: {str(e)}"
-        return False, {"error": error_msg, "risk_score": 50, "risk_flags": [f"DNS resolution failed: {error_msg}"]}
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        return False, {"error": error_msg, "risk_score": 40, "risk_flags": [f"SSL analysis failed: {error_msg}"]}
@@ -1,4 +1,5 @@
 import os
+import base64
 import requests
 import re
 from typing import Tuple, List
@@ -126,7 +127,6 @@ def check_url(url: str) -> Tuple[int, List[str]]:
                     url_id = vt.get_id(url)
                 else:
                     # Fallback: create URL ID manually
-                    import base64
                     url_id = base64.urlsafe_b64encode(url.encode()).decode().rstrip('=')
 
                 resp = vt.request(f"urls/{url_id}")
@@ -1,5 +1,6 @@
 import pytest
 import json
+from datetime import datetime
 from unittest.mock import Mock, patch
 from app import app, settings
 from utils.config import Settings
@@ -111,6 +112,31 @@ class TestApp:
         assert 'Access-Control-Allow-Origin' in response.headers
         assert response.headers['Access-Control-Allow-Origin'] == 'chrome-extension://test'
 
+    def test_security_headers(self):
+        """Test security headers are added to every response"""
+        response = self.app.get('/health')
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+        assert response.headers['X-Frame-Options'] == 'DENY'
+        assert response.headers['X-XSS-Protection'] == '1; mode=block'
+
+    def test_cors_preflight(self):
+        """Test preflight requests are answered by the CORS middleware"""
+        response = self.app.options('/check-url')
+        assert response.status_code == 204
+        assert response.headers['Access-Control-Allow-Origin'] == '*'
+        assert 'X-API-Key' in response.headers['Access-Control-Allow-Headers']
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+
+    def test_jsonify_uses_orjson_provider(self):
+        """Test jsonify output keeps Flask's date format and accepts non-string keys"""
+        from app import app as flask_app
+        from flask import jsonify
+
+        with flask_app.app_context():
+            response = jsonify({1: datetime(2025, 1, 1)})
+        assert response.mimetype == 'application/json'
+        assert response.get_data() == b'{"1":"Wed, 01 Jan 2025 00:00:00 GMT"}'
+
 class TestInputValidation:
     """Test input validation functions"""
 
@@ -130,6 +156,15 @@ class TestInputValidation:
         # Test None input
         assert sanitize_input(None) == ""
 
+    def test_sanitize_input_fast_path_matches_cleaner(self):
+        """Test that plain text skipped by the fast path is what bleach would return"""
+        from app import sanitize_input, _HTML_CLEANER, _PLAIN_TEXT_CHARS
+
+        text = "Verify your account now!\n\tReply \"yes\" (100%) ~ thanks"
+        assert _PLAIN_TEXT_CHARS.issuperset(text)
+        assert sanitize_input(text) == _HTML_CLEANER.clean(text)
+        assert sanitize_input("a\rb & c") == _HTML_CLEANER.clean("a\rb & c")
+
     def test_validate_url(self):
         """Test URL validation"""
         from app import validate_url
@@ -154,6 +189,26 @@ class TestInputValidation:
         assert url is None
         assert error is not None
 
+    def test_fast_url_check_agrees_with_validators(self):
+        """Test that the URL fast path never accepts what validators rejects"""
+        import validators
+        from app import _fast_url_ok
+
+        for url in ["https://example.com", "http://sub.example.co.uk/a?b=c",
+                    "https://-bad-.com", "https://example", "https://exa mple.com",
+                    "https://user@example.com", "ftp://example.com",
+                    "https://example.com:99999", "https://example.com/[x]"]:
+            if _fast_url_ok(url):
+                assert validators.url(url)
+
+    def test_validate_url_keeps_query_string(self):
+        """Test that URL validation does not HTML-escape query strings"""
+        from app import validate_url
+
+        url, error = validate_url("https://example.com/path?a=1&b=2")
+        assert url == "https://example.com/path?a=1&b=2"
+        assert error is None
+
     def test_validate_email(self):
         """Test email validation"""
         from app import validate_email
@@ -173,6 +228,247 @@ class TestInputValidation:
         assert email is None
         assert error is not None
 
+class TestLogIndex:
+    """Test the incremental log index"""
+
+    def test_incremental_refresh(self, tmp_path):
+        """Test that only appended lines are indexed on refresh"""
+        from utils.log_index import LogIndex
+
+        log_file = tmp_path / "phisguard.log"
+        feedback_file = tmp_path / "feedback.jsonl"
+        log_file.write_text(json.dumps({"event_type": "api_request", "endpoint": "/check-url", "ip_address": "1.2.3.4", "timestamp": "2025-01-01T00:00:00"}) + "\n")
+        feedback_file.write_text(json.dumps({"original_risk_score": 90, "ip_address": "1.2.3.4", "user_correction": "phishing"}) + "\n")
+
+        index = LogIndex(str(log_file), str(feedback_file))
+        stats = index.get_user_stats("1.2.3.4")
+        assert stats['protected_count'] == 1
+        assert stats['check_timestamps'].tolist() == [datetime(2025, 1, 1).timestamp()]
+        assert stats['high_risk_count'] == 1
+        assert stats['threat_categories'] == {"phishing": 1}
+        assert index.feedback_count == 1
+
+        with open(feedback_file, "a") as f:
+            f.write(json.dumps({"original_risk_score": 10, "ip_address": "5.6.7.8"}) + "\n")
+
+        assert index.get_user_stats("5.6.7.8")['low_risk_count'] == 1
+        assert index.feedback_count == 2
+        assert index.get_user_stats("1.2.3.4")['low_risk_count'] == 0
+        assert index.get_user_stats(None)['protected_count'] == 1
+
+    def test_least_recently_active_users_are_evicted(self, tmp_path):
+        """Test that the per-user index is capped at MAX_INDEXED_USERS"""
+        from utils import log_index
+
+        feedback_file = tmp_path / "feedback.jsonl"
+        feedback_file.write_text("".join(
+            json.dumps({"original_risk_score": 10, "ip_address": ip}) + "\n" for ip in ["a", "b", "a", "c"]
+        ))
+
+        index = log_index.LogIndex(str(tmp_path / "missing.log"), str(feedback_file))
+        with patch.object(log_index, 'MAX_INDEXED_USERS', 2):
+            index.refresh()
+
+        assert list(index.users) == ["a", "c"]
+        assert index.get_user_stats("a")['low_risk_count'] == 2
+        assert index.get_user_stats(None)['low_risk_count'] == 4
+
+class TestJsonl:
+    """Test JSONL helpers"""
+
+    def test_iter_jsonl_reversed(self, tmp_path):
+        """Test that records come back newest first across block boundaries"""
+        from utils.jsonl import iter_jsonl_reversed, iter_lines_reversed, tail_jsonl
+
+        path = tmp_path / "records.jsonl"
+        path.write_text("".join(json.dumps({"n": i}) + "\n" for i in range(5)) + "not json\n\n")
+
+        assert [item["n"] for item in iter_jsonl_reversed(str(path))] == [4, 3, 2, 1, 0]
+        assert list(iter_lines_reversed(str(path)))[:2] == [b"not json", b'{"n": 4}']
+        assert tail_jsonl(str(path), 2) == [{"n": 4}, {"n": 3}]
+        assert tail_jsonl(str(tmp_path / "missing.jsonl"), 2) == []
+
+class TestConcurrencyLimiter:
+    """Test the per-client concurrency limiter"""
+
+    def test_local_limit(self):
+        """Test that slots are capped per key and freed on release"""
+        from utils.concurrency import ConcurrencyLimiter
+
+        limiter = ConcurrencyLimiter(2)
+        first = limiter.acquire("1.2.3.4")
+        second = limiter.acquire("1.2.3.4")
+        assert first and second
+        assert limiter.acquire("1.2.3.4") is None
+        assert limiter.acquire("5.6.7.8") is not None
+
+        limiter.release("1.2.3.4", first)
+        assert limiter.acquire("1.2.3.4") is not None
+
+class TestBatchPredictor:
+    """Test request coalescing for model predictions"""
+
+    def test_concurrent_predictions_share_a_batch(self):
+        """Test that concurrent callers are served by one batched call"""
+        import gevent
+        from utils.batch_predictor import BatchPredictor
+
+        batches = []
+
+        def predict_batch(subjects, bodies):
+            batches.append(len(subjects))
+            return [f"{subject}:{body}" for subject, body in zip(subjects, bodies)]
+
+        predictor = BatchPredictor(predict_batch)
+        greenlets = [gevent.spawn(predictor.predict, "s", str(i)) for i in range(3)]
+        gevent.joinall(greenlets)
+
+        assert [g.value for g in greenlets] == ["s:0", "s:1", "s:2"]
+        assert batches == [3]
+
+class TestSimpleCache:
+    """Test the in-memory TTL cache"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is dropped once maxsize is exceeded"""
+        from utils.cache import SimpleCache
+
+        cache = SimpleCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_expiry_heap_stays_bounded(self):
+        """Test that overwrites and evictions do not grow the expiry heap without limit"""
+        from utils.cache import SimpleCache
+
+        cache = SimpleCache(maxsize=10)
+        for i in range(1000):
+            cache.set(f"k{i % 50}", i)
+
+        assert len(cache.cache) == 10
+        assert len(cache._expiry_heap) <= 2 * len(cache.cache)
+
+class TestRiskScorer:
+    """Test overall risk assessment"""
+
+    def test_skipped_checks_are_left_out(self):
+        """Test that stand-in SSL/link results for a decisive URL add no score, components or advice"""
+        from app import skipped_network_checks
+        from utils.risk_scorer import RiskScorer
+
+        ssl_results, link_results = skipped_network_checks("http://phish.example")
+        assessment = RiskScorer().calculate_overall_risk(
+            url_results={"risk_score": 97},
+            ssl_results=ssl_results,
+            link_results=link_results
+        )
+
+        assert set(assessment['components']) == {'url_risk', 'domain_reputation'}
+        # 97 * 0.35, renormalized over the 0.65 of weight that was not skipped
+        assert assessment['overall_score'] == 52.2
+        assert not any("SSL" in r or "redirect" in r for r in assessment['recommendations'])
+
+class TestEmailTextTraining:
+    """Test chunked training of the email text model"""
+
+    def test_small_tail_chunk_is_trained_without_split(self, tmp_path, monkeypatch):
+        """Test that a tail chunk too small to stratify is folded into training"""
+        from services.email_text_detector import EmailTextDetector
+
+        monkeypatch.chdir(tmp_path)
+        rows = [("verify your account password now", 1), ("lunch meeting moved to noon", 0)] * 7
+        data_path = tmp_path / "emails.csv"
+        data_path.write_text("text,label\n" + "".join(f"{text},{label}\n" for text, label in rows))
+
+        detector = EmailTextDetector(str(tmp_path / "model.pkl"), str(tmp_path / "vectorizer.pkl"))
+        results = detector.train_model(str(data_path), chunksize=10)
+
+        assert results['training_samples'] == 12
+        assert results['test_samples'] == 2
+
+class TestSslConnect:
+    """Test connecting to resolved SSL hosts"""
+
+    def test_falls_through_to_next_address(self):
+        """Test that an unreachable first address does not fail the connection"""
+        import socket
+        from services import ssl_checker
+
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        dead = socket.socket()
+        dead.bind(("127.0.0.1", 0))
+        dead_port = dead.getsockname()[1]
+        dead.close()
+
+        addresses = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", dead_port)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", listener.getsockname()),
+        ]
+        with patch.object(ssl_checker.socket, 'getaddrinfo', return_value=addresses):
+            with ssl_checker._connect("fallthrough.test") as sock:
+                assert sock.getpeername() == listener.getsockname()
+        listener.close()
+
+class TestLinkExpanderCache:
+    """Test memoization of link expansions"""
+
+    def test_only_successful_expansions_are_cached(self):
+        """Test that repeat expansions are served from cache and failures are retried"""
+        from services import link_expander
+
+        calls = []
+
+        def fake_impl(url, max_redirects, only_shorteners):
+            calls.append(url)
+            error = "Connection failed" if "down" in url else None
+            return url, [], {}, error
+
+        link_expander.clear_cache()
+        with patch.object(link_expander, '_expand_link_impl', fake_impl):
+            link_expander.expand_link("https://bit.ly/ok")
+            link_expander.expand_link("https://bit.ly/ok")
+            link_expander.expand_link("https://bit.ly/down")
+            link_expander.expand_link("https://bit.ly/down")
+        link_expander.clear_cache()
+
+        assert calls == ["https://bit.ly/ok", "https://bit.ly/down", "https://bit.ly/down"]
+
+    def test_sessions_share_pool_but_not_cookies(self):
+        """Test that each expansion gets its own cookie jar on the shared connection pool"""
+        from services import link_expander
+
+        first = link_expander._new_session(5)
+        first.cookies.set("session", "victim")
+        second = link_expander._new_session(5)
+
+        assert second.get_adapter("https://bit.ly/x") is first.get_adapter("https://bit.ly/x")
+        assert len(second.cookies) == 0
+
+class TestFeedbackWriter:
+    """Test the batched feedback writer"""
+
+    def test_flush_appends_records(self, tmp_path):
+        """Test that queued records are appended as JSON lines"""
+        from utils.feedback_writer import FeedbackWriter
+
+        path = tmp_path / "data" / "feedback.jsonl"
+        writer = FeedbackWriter(str(path))
+        writer._thread = True  # Flush manually instead of from the background thread
+        writer.write({"url": "https://example.com", "is_correct": True})
+        writer.write({"url": "https://example.org", "is_correct": False})
+        writer.flush()
+
+        lines = path.read_text().splitlines()
+        assert [json.loads(line)["url"] for line in lines] == ["https://example.com", "https://example.org"]
+
 class TestConfiguration:
     """Test configuration management"""
 
@@ -0,0 +1,54 @@
+import logging
+from typing import Any, Callable, List
+
+import gevent
+import gevent.queue
+from gevent.event import AsyncResult
+
+logger = logging.getLogger(__name__)
+
+
+class BatchPredictor:
+    """Coalesces concurrent single predictions into one batched model call"""
+
+    def __init__(self, predict_batch: Callable[..., List[Any]], max_batch: int = 32, max_wait: float = 0.005):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = gevent.queue.Queue()
+        self._worker = None
+
+    def predict(self, *inputs, timeout: float = 2.0) -> Any:
+        """Queue one input tuple and wait cooperatively for its prediction"""
+        result = AsyncResult()
+        self._queue.put((inputs, result))
+        if self._worker is None or self._worker.dead:
+            self._worker = gevent.spawn(self._run)
+        try:
+            return result.get(timeout=timeout)
+        except gevent.Timeout:
+            raise TimeoutError("Batched prediction timed out")
+
+    def _run(self) -> None:
+        while True:
+            # Block for the first request, then give concurrent requests a moment to join
+            batch = [self._queue.get()]
+            gevent.sleep(self.max_wait)
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except gevent.queue.Empty:
+                    break
+
+            try:
+                # Transpose [(subject, body), ...] into ([subjects], [bodies])
+                columns = [list(column) for column in zip(*(inputs for inputs, _ in batch))]
+                outputs = self.predict_batch(*columns)
+            except Exception as e:
+                logger.error(f"Error in batched prediction: {str(e)}")
+                for _, result in batch:
+                    result.set_exception(e)
+                continue
+
+            for (_, result), output in zip(batch, outputs):
+                result.set(output)
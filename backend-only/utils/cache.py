@@ -1,57 +1,78 @@
 import time
-import hashlib
-from typing import Any, Optional
+import heapq
+import threading
+import functools
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
 import os
 
 class SimpleCache:
-    """Simple in-memory cache with TTL support"""
+    """Simple in-memory LRU cache with TTL support"""
 
-    def __init__(self, default_ttl: int = 300):  # 5 minutes default
-        self.cache = {}
+    def __init__(self, default_ttl: int = 300, maxsize: int = 10000):  # 5 minutes default
+        # Keys are used as-is; least recently used entries sit at the front
+        self.cache = OrderedDict()
+        # (expiry, key) min-heap; entries left behind by re-sets or evictions are skipped in cleanup
+        # and compacted away in set
+        self._expiry_heap: List[Tuple[float, str]] = []
         self.default_ttl = default_ttl
-
-    def _make_key(self, key: str) -> str:
-        """Create a consistent cache key"""
-        return hashlib.md5(key.encode()).hexdigest()
+        self.maxsize = maxsize
+        # Shared with the dashboard refresher and SSL pool workers; guards every read-modify-write
+        self._lock = threading.Lock()
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
-        cache_key = self._make_key(key)
-        if cache_key in self.cache:
-            value, expiry = self.cache[cache_key]
-            if time.time() < expiry:
-                return value
-            else:
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            value, expiry = entry
+            if time.time() >= expiry:
                 # Remove expired entry
-                del self.cache[cache_key]
-        return None
+                self.cache.pop(key, None)
+                return None
+            self.cache.move_to_end(key)
+            return value
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Set value in cache with TTL"""
-        cache_key = self._make_key(key)
+        """Set value in cache with TTL, evicting the least recently used entry when full"""
         expiry = time.time() + (ttl or self.default_ttl)
-        self.cache[cache_key] = (value, expiry)
+        with self._lock:
+            self.cache.pop(key, None)
+            self.cache[key] = (value, expiry)
+            heapq.heappush(self._expiry_heap, (expiry, key))
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+            # Overwrites, evictions and deletes leave stale heap entries behind; rebuild from the
+            # live entries once they outnumber them, so the heap stays within 2x the cache
+            if len(self._expiry_heap) > 2 * len(self.cache):
+                self._expiry_heap = [(entry_expiry, entry_key) for entry_key, (_, entry_expiry) in self.cache.items()]
+                heapq.heapify(self._expiry_heap)
 
     def delete(self, key: str) -> None:
         """Delete value from cache"""
-        cache_key = self._make_key(key)
-        if cache_key in self.cache:
-            del self.cache[cache_key]
+        with self._lock:
+            self.cache.pop(key, None)
 
     def clear(self) -> None:
         """Clear all cache entries"""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+            self._expiry_heap.clear()
 
     def cleanup(self) -> int:
         """Remove expired entries and return count of removed items"""
         current_time = time.time()
-        expired_keys = [
-            key for key, (_, expiry) in self.cache.items()
-            if current_time >= expiry
-        ]
-        for key in expired_keys:
-            del self.cache[key]
-        return len(expired_keys)
+        removed = 0
+        # Only pops entries that are due, instead of scanning the whole cache
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= current_time:
+                expiry, key = heapq.heappop(self._expiry_heap)
+                entry = self.cache.get(key)
+                if entry is not None and entry[1] == expiry:
+                    del self.cache[key]
+                    removed += 1
+        return removed
 
 # Global cache instance
 cache = SimpleCache()
@@ -63,12 +84,16 @@ def get_cache():
 def cached(ttl: Optional[int] = None):
     """Decorator to cache function results"""
     def decorator(func):
-        def wrapper(*args, **kwargs):
+        def make_key(*args, **kwargs):
             # Create cache key from function name and arguments
             key_parts = [func.__name__]
             key_parts.extend(str(arg) for arg in args)
             key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
-            cache_key = "|".join(key_parts)
+            return "|".join(key_parts)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = make_key(*args, **kwargs)
 
             # Try to get from cache
             cached_result = cache.get(cache_key)
@@ -79,5 +104,14 @@ def cached(ttl: Optional[int] = None):
             result = func(*args, **kwargs)
             cache.set(cache_key, result, ttl)
             return result
+
+        def refresh(*args, **kwargs):
+            """Recompute and store the result ahead of expiry"""
+            result = func(*args, **kwargs)
+            cache.set(make_key(*args, **kwargs), result, ttl)
+            return result
+
+        wrapper.refresh = refresh
+        wrapper.ttl = ttl or cache.default_ttl
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,76 @@
+import time
+import uuid
+import logging
+import threading
+from collections import defaultdict
+from typing import Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Drop stale holders, then admit the request only if the caller is under the limit
+_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[1]) - tonumber(ARGV[2]))
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])))
+return 1
+"""
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests per caller, shared across workers when Redis is available"""
+
+    def __init__(self, limit: int, redis_pool=None, timeout: float = 60.0, prefix: str = 'phisguard:concurrency'):
+        self.limit = limit
+        # Holders older than this are assumed to have died without releasing
+        self.timeout = timeout
+        self.prefix = prefix
+        self._redis = None
+        self._acquire_script = None
+        if REDIS_AVAILABLE and redis_pool is not None:
+            self._redis = redis.Redis(connection_pool=redis_pool)
+            self._acquire_script = self._redis.register_script(_ACQUIRE_SCRIPT)
+        self._local = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> Optional[str]:
+        """Reserve a slot for key; returns a token to release, or None if the caller is at the limit"""
+        token = uuid.uuid4().hex
+        if self._acquire_script is not None:
+            try:
+                admitted = self._acquire_script(
+                    keys=[f"{self.prefix}:{key}"],
+                    args=[time.time(), self.timeout, self.limit, token]
+                )
+                return token if admitted else None
+            except redis.RedisError as e:
+                logger.warning(f"Concurrency limiter Redis error: {str(e)}. Using local counter.")
+
+        with self._lock:
+            if self._local[key] >= self.limit:
+                return None
+            self._local[key] += 1
+        return token
+
+    def release(self, key: str, token: str) -> None:
+        """Free a slot reserved by acquire"""
+        if self._redis is not None:
+            try:
+                if self._redis.zrem(f"{self.prefix}:{key}", token):
+                    return
+            except redis.RedisError as e:
+                logger.warning(f"Concurrency limiter Redis error: {str(e)}")
+
+        with self._lock:
+            if self._local.get(key, 0) > 1:
+                self._local[key] -= 1
+            else:
+                self._local.pop(key, None)
@@ -1,6 +1,7 @@
 from pydantic import field_validator, ConfigDict
 from pydantic_settings import BaseSettings
 from typing import Optional, List
+import functools
 import os
 
 class Settings(BaseSettings):
@@ -30,6 +31,9 @@ class Settings(BaseSettings):
     # Rate limiting
     rate_limit_requests_per_minute: int = 60
     redis_url: Optional[str] = None
+    redis_max_connections: int = 50
+    max_concurrent_checks: int = 5
+    service_pool_size: int = 64
 
     # External API keys
     google_safe_browsing_api_key: Optional[str] = None
@@ -46,10 +50,12 @@ class Settings(BaseSettings):
     ssl_verify_certificates: bool = True
     max_redirects: int = 10
 
+    # Settings are read once at startup and never reassigned
     model_config = ConfigDict(
         env_file=".env",
         case_sensitive=False,
-        extra='ignore'
+        extra='ignore',
+        frozen=True
     )
 
     @field_validator('secret_key')
@@ -90,9 +96,9 @@ class Settings(BaseSettings):
                 raise ValueError(f'Invalid CORS origin: {origin}')
         return v  # Return the original string
 
-    @property
+    @functools.cached_property
     def cors_origins(self) -> List[str]:
-        """Get CORS origins as a list"""
+        """Get CORS origins as a list, split once"""
         return [origin.strip() for origin in self.cors_origins_str.split(',') if origin.strip()]
 
     @field_validator('log_level')
@@ -103,9 +109,10 @@ class Settings(BaseSettings):
             raise ValueError(f'Invalid log level: {v}. Must be one of {valid_levels}')
         return v.upper()
 
-# Global settings instance
-settings = Settings()
-
+@functools.lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get application settings"""
-    return settings
\ No newline at end of file
+    return Settings()
+
+# Global settings instance
+settings = get_settings()
\ No newline at end of file
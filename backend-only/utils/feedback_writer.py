@@ -0,0 +1,78 @@
+import os
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict
+
+import orjson
+
+from utils.log_index import FEEDBACK_FILE
+
+logger = logging.getLogger(__name__)
+
+
+class FeedbackWriter:
+    """Append-only JSONL writer that batches records off the request path"""
+
+    def __init__(self, path: str = FEEDBACK_FILE, batch_interval: float = 0.1):
+        self.path = path
+        self.batch_interval = batch_interval
+        self._queue = queue.Queue()
+        self._file = None
+        self._lock = threading.Lock()
+        self._thread = None
+        atexit.register(self.flush)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Queue a record for appending; returns without touching the disk"""
+        self._queue.put(orjson.dumps(record) + b'\n')
+        if self._thread is None:
+            self._start()
+
+    def flush(self) -> None:
+        """Write every queued record to disk"""
+        self._write_batch(self._drain([]))
+
+    def _drain(self, batch):
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write_batch(self, batch) -> None:
+        if not batch:
+            return
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                # One long-lived handle instead of an open()/close() per record
+                self._file = open(self.path, 'ab', buffering=1 << 20)
+            self._file.write(b''.join(batch))
+            self._file.flush()
+
+    def _run(self) -> None:
+        while True:
+            # Block for the first record, then give others a moment to pile up
+            batch = [self._queue.get()]
+            time.sleep(self.batch_interval)
+            try:
+                self._write_batch(self._drain(batch))
+            except Exception as e:
+                logger.error(f"Error writing feedback batch: {str(e)}")
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='feedback-writer', daemon=True)
+                self._thread.start()
+
+
+# Global feedback writer instance
+feedback_writer = FeedbackWriter()
+
+def get_feedback_writer():
+    """Get the global feedback writer instance"""
+    return feedback_writer
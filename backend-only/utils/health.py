@@ -1,6 +1,6 @@
 import time
 from datetime import datetime
-from utils.cache import get_cache
+from utils.cache import get_cache, cached
 from utils.logger import get_security_logger
 
 try:
@@ -10,6 +10,25 @@ except ImportError:
     PSUTIL_AVAILABLE = False
     psutil = None
 
+# Probed once at import; availability can't change while the process runs
+_DEPENDENCIES = {
+    "flask": False,
+    "requests": False,
+    "psutil": PSUTIL_AVAILABLE
+}
+
+try:
+    import flask
+    _DEPENDENCIES["flask"] = True
+except ImportError:
+    pass
+
+try:
+    import requests
+    _DEPENDENCIES["requests"] = True
+except ImportError:
+    pass
+
 class HealthChecker:
     """Comprehensive health checker for the application"""
 
@@ -17,24 +36,32 @@ class HealthChecker:
         self.start_time = time.time()
         self.cache = get_cache()
         self.logger = get_security_logger()
+        if PSUTIL_AVAILABLE:
+            # The first non-blocking cpu_percent call only sets the baseline
+            psutil.cpu_percent(interval=None)
 
+    @cached(ttl=5)
     def get_system_health(self):
-        """Get system-level health metrics"""
+        """Get system-level health metrics; concurrent probes share one snapshot"""
         if not PSUTIL_AVAILABLE:
             return {"error": "System metrics unavailable - psutil not installed"}
 
         try:
+            # Non-blocking: utilization since the previous call (primed in __init__)
+            cpu_percent = psutil.cpu_percent(interval=None)
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
             return {
-                "cpu_percent": psutil.cpu_percent(interval=1),
+                "cpu_percent": cpu_percent,
                 "memory": {
-                    "total": psutil.virtual_memory().total,
-                    "available": psutil.virtual_memory().available,
-                    "percent": psutil.virtual_memory().percent
+                    "total": memory.total,
+                    "available": memory.available,
+                    "percent": memory.percent
                 },
                 "disk": {
-                    "total": psutil.disk_usage('/').total,
-                    "free": psutil.disk_usage('/').free,
-                    "percent": psutil.disk_usage('/').percent
+                    "total": disk.total,
+                    "free": disk.free,
+                    "percent": disk.percent
                 }
             }
         except Exception as e:
@@ -61,27 +88,7 @@ class HealthChecker:
 
     def check_dependencies(self):
         """Check if critical dependencies are available"""
-        dependencies = {
-            "flask": False,
-            "requests": False,
-            "psutil": False
-        }
-
-        try:
-            import flask
-            dependencies["flask"] = True
-        except ImportError:
-            pass
-
-        try:
-            import requests
-            dependencies["requests"] = True
-        except ImportError:
-            pass
-
-        dependencies["psutil"] = PSUTIL_AVAILABLE
-
-        return dependencies
+        return dict(_DEPENDENCIES)
 
     def get_full_health_report(self):
         """Get comprehensive health report"""
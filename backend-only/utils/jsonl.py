@@ -0,0 +1,39 @@
+import os
+import mmap
+import itertools
+from typing import Any, Iterator, List
+
+import orjson
+
+
+def iter_lines_reversed(path: str) -> Iterator[bytes]:
+    """Yield the non-empty lines of a file from last to first"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        # Walk newline offsets backwards through a read-only mapping; only the tail is paged in
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            end = size
+            while end > 0:
+                start = mm.rfind(b'\n', 0, end) + 1
+                line = mm[start:end]
+                if line.strip():
+                    yield line
+                end = start - 1
+
+
+def iter_jsonl_reversed(path: str) -> Iterator[Any]:
+    """Yield parsed JSONL records newest first, skipping malformed lines"""
+    for line in iter_lines_reversed(path):
+        try:
+            yield orjson.loads(line)
+        except ValueError:
+            continue
+
+
+def tail_jsonl(path: str, n: int) -> List[Any]:
+    """Get the last n valid JSONL records, newest first"""
+    if not os.path.exists(path):
+        return []
+    return list(itertools.islice(iter_jsonl_reversed(path), n))
@@ -0,0 +1,238 @@
+import os
+import mmap
+import threading
+from datetime import datetime
+from collections import Counter, OrderedDict, deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+import orjson
+
+from utils.config import get_settings
+
+FEEDBACK_FILE = 'data/user_feedback.jsonl'
+
+# Bounded per-user history so a single noisy client cannot grow memory without limit,
+# and a bounded number of users (least recently active evicted first) so many clients cannot either
+MAX_EVENTS_PER_USER = 1000
+MAX_INDEXED_USERS = 10000
+RECENT_LINES = 50
+
+# Per-user columns handed to readers as contiguous NumPy arrays
+_ARRAY_FIELDS = {
+    'check_timestamps': np.float64,
+    'detection_times': np.float64,
+    'detection_scores': np.float32
+}
+
+
+def _to_epoch(timestamp_str: str) -> Optional[float]:
+    """Parse an ISO-8601 timestamp into epoch seconds (naive values are local time)"""
+    if not timestamp_str:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00')).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _new_user_stats() -> Dict[str, Any]:
+    """Create an empty per-user aggregate"""
+    return {
+        'protected_count': 0,
+        'check_timestamps': deque(maxlen=MAX_EVENTS_PER_USER),
+        'timeline': deque(maxlen=MAX_EVENTS_PER_USER),
+        'high_risk_count': 0,
+        'medium_risk_count': 0,
+        'low_risk_count': 0,
+        # Detections are stored column-wise; the three deques stay index-aligned
+        'detection_times': deque(maxlen=MAX_EVENTS_PER_USER),
+        'detection_scores': deque(maxlen=MAX_EVENTS_PER_USER),
+        'detections': deque(maxlen=MAX_EVENTS_PER_USER),
+        'threat_categories': Counter()
+    }
+
+
+class _TailedFile:
+    """Tracks the read offset of an append-only JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+
+    def read_new_lines(self):
+        """Return complete lines appended since the last call"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return None
+
+        if size < self.offset:
+            # File was truncated or rotated - start over
+            return None
+        if size == self.offset:
+            return []
+
+        lines = []
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            pos = self.offset
+            while True:
+                nl = mm.find(b'\n', pos)
+                if nl < 0:
+                    break
+                lines.append(mm[pos:nl])
+                pos = nl + 1
+        # An incomplete trailing line is re-read once the writer finishes it
+        self.offset = pos
+        return lines
+
+
+class LogIndex:
+    """Incrementally maintained in-memory index over the security log and feedback files"""
+
+    def __init__(self, log_file: str, feedback_file: str = FEEDBACK_FILE):
+        self.log_file = log_file
+        self.feedback_file = feedback_file
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._log = _TailedFile(self.log_file)
+        self._feedback = _TailedFile(self.feedback_file)
+        self.users = OrderedDict()
+        self.all_users = _new_user_stats()
+        self.total_api_requests = 0
+        self.recent_entries = deque(maxlen=RECENT_LINES)
+        self.feedback_count = 0
+
+    def _user_stats(self, key: str) -> Dict[str, Any]:
+        """Get or create the aggregate for a user id or IP, evicting the least recently active past MAX_INDEXED_USERS"""
+        stats = self.users.get(key)
+        if stats is None:
+            stats = self.users[key] = _new_user_stats()
+            if len(self.users) > MAX_INDEXED_USERS:
+                self.users.popitem(last=False)
+        else:
+            self.users.move_to_end(key)
+        return stats
+
+    def refresh(self) -> None:
+        """Consume any lines appended to the tracked files since the last refresh"""
+        with self._lock:
+            log_lines = self._log.read_new_lines()
+            feedback_lines = self._feedback.read_new_lines()
+            if (log_lines is None and self._log.offset) or (feedback_lines is None and self._feedback.offset):
+                # A tracked file shrank; rebuild from scratch
+                self._reset()
+                log_lines = self._log.read_new_lines()
+                feedback_lines = self._feedback.read_new_lines()
+
+            for line in log_lines or ():
+                self._index_log_line(line)
+            for line in feedback_lines or ():
+                self._index_feedback_line(line)
+
+    def _index_log_line(self, line: bytes) -> None:
+        try:
+            log_entry = orjson.loads(line)
+        except ValueError:
+            self.recent_entries.append(None)
+            return
+        if not isinstance(log_entry, dict):
+            self.recent_entries.append(None)
+            return
+
+        self.recent_entries.append(log_entry)
+
+        event_type = log_entry.get('event_type', '')
+        endpoint = log_entry.get('endpoint', '')
+        if event_type == 'api_request':
+            self.total_api_requests += 1
+
+        is_check = event_type == 'api_request' and 'check-url' in endpoint
+        in_timeline = event_type in ('api_request', 'security_event')
+        if not (is_check or in_timeline):
+            return
+
+        timestamp_str = log_entry.get('timestamp', '')
+        timestamp = _to_epoch(timestamp_str) if is_check else None
+        keys = {log_entry.get('user_id'), log_entry.get('ip_address')}
+        keys.discard(None)
+        for stats in [self.all_users] + [self._user_stats(key) for key in keys]:
+            if is_check:
+                stats['protected_count'] += 1
+                if timestamp is not None:
+                    stats['check_timestamps'].append(timestamp)
+            if in_timeline:
+                stats['timeline'].append({
+                    'timestamp': timestamp_str,
+                    'event': f"{event_type}: {log_entry.get('endpoint', 'Unknown')}"
+                })
+
+    def _index_feedback_line(self, line: bytes) -> None:
+        if not line.strip():
+            return
+        self.feedback_count += 1
+        try:
+            feedback_item = orjson.loads(line)
+        except ValueError:
+            return
+        if not isinstance(feedback_item, dict):
+            return
+
+        risk_score = feedback_item.get('original_risk_score') or 0
+        timestamp_str = feedback_item.get('timestamp', '')
+        timestamp = _to_epoch(timestamp_str)
+        correction = feedback_item.get('user_correction', '')
+        keys = {
+            feedback_item.get('user_id'),
+            feedback_item.get('extension_user_id'),
+            feedback_item.get('ip_address')
+        }
+        keys.discard(None)
+
+        for stats in [self.all_users] + [self._user_stats(key) for key in keys]:
+            if risk_score >= 70:
+                stats['high_risk_count'] += 1
+            elif risk_score >= 40:
+                stats['medium_risk_count'] += 1
+            else:
+                stats['low_risk_count'] += 1
+
+            if timestamp is not None:
+                stats['detection_times'].append(timestamp)
+                stats['detection_scores'].append(risk_score)
+                stats['detections'].append((timestamp_str, feedback_item.get('url', 'Unknown')))
+
+            if correction:
+                stats['threat_categories'][correction] += 1
+
+    def get_user_stats(self, user_id: Optional[str]) -> Dict[str, Any]:
+        """Get the aggregate for a user (or for everyone if no user is given)"""
+        self.refresh()
+        with self._lock:
+            stats = self.all_users if not user_id else self.users.get(user_id)
+            if stats is None:
+                stats = _new_user_stats()
+            # Snapshot so callers can iterate while the tailer keeps appending
+            snapshot = {}
+            for key, value in stats.items():
+                if key in _ARRAY_FIELDS:
+                    snapshot[key] = np.fromiter(value, dtype=_ARRAY_FIELDS[key], count=len(value))
+                elif isinstance(value, deque):
+                    snapshot[key] = list(value)
+                elif isinstance(value, dict):
+                    snapshot[key] = dict(value)
+                else:
+                    snapshot[key] = value
+            return snapshot
+
+
+# Global log index instance
+log_index = LogIndex(get_settings().log_file)
+
+def get_log_index():
+    """Get the global log index instance"""
+    return log_index
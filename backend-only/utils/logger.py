@@ -1,10 +1,88 @@
+import atexit
+import copy
 import logging
-import json
+import logging.handlers
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
 from typing import Dict, Any
 import os
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+_LEVELS = {'ERROR': logging.ERROR, 'WARNING': logging.WARNING}
+
+# WARNINGs are written to the JSON log in batches of up to LOG_BUFFER_CAPACITY records,
+# while ERROR and above flush the batch immediately. A partial batch is flushed at least
+# every LOG_FLUSH_INTERVAL seconds so quiet periods lose nothing. Every gunicorn worker
+# appends to the same file, so rotation is left to logrotate (see DEPLOYMENT_GUIDE.md);
+# WatchedFileHandler reopens the file once it has been moved away
+LOG_BUFFER_CAPACITY = 512
+LOG_FLUSH_INTERVAL = 2.0
+
+# Structured fields passed via extra= that JSONFormatter copies into each entry
+_EXTRA_FIELDS = (
+    'event_type', 'ip_address', 'user_id', 'details', 'user_agent',
+    'endpoint', 'method', 'status_code', 'duration_ms', 'error_type', 'error_message'
+)
+
+def _compile_extras_copier(fields):
+    """Generate copy(attrs, entry): one straight-line membership test and store per field"""
+    body = ''.join(
+        f"    if {field!r} in attrs:\n        entry[{field!r}] = attrs[{field!r}]\n" for field in fields
+    )
+    namespace = {}
+    exec(f"def copy(attrs, entry):\n{body}", namespace)
+    return namespace['copy']
+
+_copy_extras = _compile_extras_copier(_EXTRA_FIELDS)
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves exc_info on the record so tracebacks are formatted on the listener thread"""
+
+    def __init__(self, queue, start_listener):
+        super().__init__(queue)
+        self._start_listener = start_listener
+
+    def enqueue(self, record):
+        # The listener thread is started by the first record logged in each process
+        if self._start_listener is not None:
+            self._start_listener()
+        self.queue.put_nowait(record)
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that also flushes the buffered file handler every LOG_FLUSH_INTERVAL seconds"""
+
+    def __init__(self, queue, buffered_handler, *handlers, **kwargs):
+        super().__init__(queue, *handlers, **kwargs)
+        self._buffered_handler = buffered_handler
+        self._next_flush = time.monotonic() + LOG_FLUSH_INTERVAL
+
+    def dequeue(self, block):
+        while True:
+            timeout = self._next_flush - time.monotonic()
+            if timeout <= 0:
+                self._buffered_handler.flush()
+                self._next_flush = time.monotonic() + LOG_FLUSH_INTERVAL
+                continue
+            try:
+                return self.queue.get(block, timeout)
+            except queue.Empty:
+                pass
+
 class SecurityLogger:
     """Enhanced security logging with structured JSON output"""
 
@@ -28,24 +106,69 @@ class SecurityLogger:
 
         # File handler for production
         log_file = os.getenv('LOG_FILE', 'phisguard.log')
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(json_formatter)
+        watched_handler = logging.handlers.WatchedFileHandler(log_file)
+        watched_handler.setFormatter(json_formatter)
+        file_handler = logging.handlers.MemoryHandler(
+            LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=watched_handler
+        )
         file_handler.setLevel(logging.WARNING)
-
-        self.logger.addHandler(console_handler)
-        self.logger.addHandler(file_handler)
+        self._file_handler = file_handler
+
+        # Formatting and writes happen on the listener thread; callers only enqueue.
+        # The listener thread, which also does the periodic flush, is started lazily by the
+        # first record in each process, so a gunicorn preload master never forks it into workers dead.
+        # queue.Queue rather than SimpleQueue: gevent's queue patch swaps SimpleQueue
+        # for a greenlet-only version
+        self._handlers = (console_handler, file_handler)
+        self._start_lock = threading.Lock()
+        self._listener = None
+        self._queue_handler = _DeferredQueueHandler(queue.Queue(), self._ensure_listener)
+        self.logger.addHandler(self._queue_handler)
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+        atexit.register(self.close)
 
         # Prevent duplicate logs
         self.logger.propagate = False
 
+    def _ensure_listener(self):
+        """Start this process's listener thread if it is not running yet"""
+        if self._listener is not None:
+            return
+        with self._start_lock:
+            if self._listener is not None:
+                return
+            listener = _FlushingQueueListener(
+                self._queue_handler.queue, self._file_handler, *self._handlers, respect_handler_level=True
+            )
+            listener.start()
+            self._listener = listener
+
+    def _reset_after_fork(self):
+        """Drop the parent's threads and queue in a forked child; the next record starts fresh ones"""
+        self._start_lock = threading.Lock()
+        self._listener = None
+        self._queue_handler.queue = queue.Queue()
+        self._file_handler.buffer = []  # the parent still owns and flushes its buffered records
+
+    def close(self):
+        """Flush queued records and stop the listener thread"""
+        with self._start_lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+        self._file_handler.close()  # flushes buffered records to the log file
+
     def log_security_event(self, event_type: str, details: Dict[str, Any],
                           ip_address: str, user_agent: str = None,
                           endpoint: str = None, level: str = 'WARNING',
                           user_id: str = None):
         """Log security-related events with structured data"""
 
+        levelno = _LEVELS.get(level, logging.INFO)
+        if not self.logger.isEnabledFor(levelno):
+            return
+
         log_data = {
-            'timestamp': datetime.utcnow().isoformat(),
             'event_type': event_type,
             'ip_address': ip_address,
             'user_id': user_id,
@@ -55,19 +178,16 @@ class SecurityLogger:
             'severity': level
         }
 
-        if level == 'ERROR':
-            self.logger.error(f"Security event: {event_type}", extra=log_data)
-        elif level == 'WARNING':
-            self.logger.warning(f"Security event: {event_type}", extra=log_data)
-        else:
-            self.logger.info(f"Security event: {event_type}", extra=log_data)
+        self.logger.log(levelno, "Security event: %s", event_type, extra=log_data)
 
     def log_api_request(self, method: str, endpoint: str, ip_address: str,
                        user_agent: str, status_code: int, duration: float):
         """Log API requests for monitoring"""
 
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
         self.logger.info("API Request", extra={
-            'timestamp': datetime.utcnow().isoformat(),
             'method': method,
             'endpoint': endpoint,
             'ip_address': ip_address,
@@ -77,15 +197,16 @@ class SecurityLogger:
             'event_type': 'api_request'
         })
 
-    def log_error(self, error_type: str, message: str, traceback: str = None,
+    def log_error(self, error_type: str, message: str, exc_info=None,
                  ip_address: str = None, endpoint: str = None):
-        """Log application errors"""
+        """Log application errors; exc_info is formatted only if a handler emits the record"""
+
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
 
-        self.logger.error(f"Application error: {error_type}", extra={
-            'timestamp': datetime.utcnow().isoformat(),
+        self.logger.error("Application error: %s", error_type, exc_info=exc_info, extra={
             'error_type': error_type,
-            'message': message,
-            'traceback': traceback,
+            'error_message': message,
             'ip_address': ip_address or 'Unknown',
             'endpoint': endpoint or 'Unknown',
             'event_type': 'application_error'
@@ -94,34 +215,34 @@ class SecurityLogger:
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stamp_second = None
+        self._stamp_prefix = ''
+
+    def _timestamp(self, record) -> str:
+        """UTC ISO timestamp from record.created; the seconds part is formatted once per second"""
+        second = int(record.created)
+        if second != self._stamp_second:
+            self._stamp_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+            self._stamp_second = second
+        return f"{self._stamp_prefix}.{int(record.msecs):03d}"
+
     def format(self, record):
         log_entry = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': self._timestamp(record),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
         }
 
-        # Add extra fields if present
-        if hasattr(record, 'event_type'):
-            log_entry['event_type'] = record.event_type
-        if hasattr(record, 'ip_address'):
-            log_entry['ip_address'] = record.ip_address
-        if hasattr(record, 'user_id'):
-            log_entry['user_id'] = record.user_id
-        if hasattr(record, 'details'):
-            log_entry['details'] = record.details
-        if hasattr(record, 'user_agent'):
-            log_entry['user_agent'] = record.user_agent
-        if hasattr(record, 'endpoint'):
-            log_entry['endpoint'] = record.endpoint
-        if hasattr(record, 'method'):
-            log_entry['method'] = record.method
-        if hasattr(record, 'status_code'):
-            log_entry['status_code'] = record.status_code
-        if hasattr(record, 'duration_ms'):
-            log_entry['duration_ms'] = record.duration_ms
+        # Add extra fields if present, reading the record's attribute dict once
+        _copy_extras(record.__dict__, log_entry)
+        if record.exc_info:
+            log_entry['traceback'] = self.formatException(record.exc_info)
 
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(log_entry, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
         return json.dumps(log_entry, default=str)
 
 # Global security logger instance
@@ -0,0 +1,51 @@
+from typing import Any, Dict, Optional
+
+import orjson
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+from utils.json_provider import ORJSON_OPTIONS
+
+
+def _enc_hook(obj: Any) -> Any:
+    """Convert NumPy scalars/arrays from the ML scorers to plain Python values"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise NotImplementedError(f"Objects of type {type(obj).__name__} are not supported")
+
+
+if MSGSPEC_AVAILABLE:
+    class IndividualChecks(msgspec.Struct):
+        """Per-checker results of a comprehensive check"""
+        url_check: Optional[Dict[str, Any]] = None
+        ssl_check: Optional[Dict[str, Any]] = None
+        link_expansion: Optional[Dict[str, Any]] = None
+        breach_check: Optional[Dict[str, Any]] = None
+        email_text_check: Optional[Dict[str, Any]] = None
+
+    class CheckResponse(msgspec.Struct):
+        """Body of a /comprehensive-check response"""
+        url: str
+        assessment: Dict[str, Any]
+        individual_checks: IndividualChecks
+
+    _encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+
+def encode_check_response(url: str, assessment: Dict[str, Any], **checks: Optional[Dict[str, Any]]) -> bytes:
+    """Serialize a comprehensive-check result to JSON bytes"""
+    if MSGSPEC_AVAILABLE:
+        return _encoder.encode(CheckResponse(
+            url=url,
+            assessment=assessment,
+            individual_checks=IndividualChecks(**checks)
+        ))
+    return orjson.dumps(
+        {"url": url, "assessment": assessment, "individual_checks": checks},
+        default=_enc_hook,
+        option=ORJSON_OPTIONS
+    )
@@ -1,5 +1,112 @@
+import re
+import bisect
+import numpy as np
+from datetime import datetime
 from typing import Dict, List, Any, Tuple
 
+_SHORTENERS = ('bit.ly', 'tinyurl', 'goo.gl')
+_SUSPICIOUS_KEYWORDS = ('login', 'password', 'bank', 'paypal', 'secure')
+
+# One case-insensitive alternation per pattern list: a single scan per string, no lowered copy
+_SHORTENER_RE = re.compile("|".join(map(re.escape, _SHORTENERS)), re.IGNORECASE)
+_SUSPICIOUS_KEYWORD_RE = re.compile("|".join(map(re.escape, _SUSPICIOUS_KEYWORDS)), re.IGNORECASE)
+
+# Lower bounds of the low/medium/high risk levels; scores below the first are very_low
+_LEVEL_THRESHOLDS = (20, 40, 70)
+_LEVEL_NAMES = ('very_low', 'low', 'medium', 'high')
+# Opening recommendations for each level, in _LEVEL_NAMES order
+_LEVEL_RECOMMENDATIONS = (
+    ("✅ VERY LOW RISK: This resource appears safe to use.",),
+    ("ℹ️ LOW RISK: Generally safe, but monitor for suspicious activity.",),
+    ("⚠️ MEDIUM RISK: Exercise caution when interacting with this resource.",
+     "Verify the destination manually before proceeding."),
+    ("🚨 HIGH RISK: Do not proceed. This appears to be malicious.",
+     "Report this URL to security authorities if appropriate."),
+)
+
+# Column order of the score vectors passed to RiskScorer.calculate_batch
+RISK_COMPONENTS = ('url_risk', 'ssl_validity', 'link_redirects', 'domain_reputation', 'breach_history', 'email_text_risk')
+
+# Basic SSL assessment used when the checker supplied no risk score: the first matching
+# (predicate, score, message) wins; messages are formatted with the SSL results
+_SSL_FALLBACK_RULES = (
+    (lambda r: r.get('connection_type') == 'http', 60, "Connection is unencrypted (HTTP)"),
+    (lambda r: r.get('is_valid') is False, 80, "SSL certificate is invalid"),
+    (lambda r: r.get('is_expired'), 60, "SSL certificate is expired"),
+    (lambda r: r.get('days_until_expiry', 30) < 30, 40, "SSL certificate expires in {days_until_expiry} days"),
+    (lambda r: r.get('is_self_signed'), 50, "Self-signed certificate detected"),
+    (lambda r: r.get('is_wildcard'), 15, "Wildcard certificate - verify subdomain trust"),
+    (lambda r: True, 10, "SSL certificate is valid"),
+)
+
+def _score_url(url_results: Dict) -> Tuple[float, List[str], Dict[str, Any]]:
+    return url_results.get('risk_score', 0), url_results.get('details', []), {
+        'recommendation': url_results.get('recommendation', 'unknown')
+    }
+
+def _score_ssl(ssl_results: Dict) -> Tuple[float, List[str], Dict[str, Any]]:
+    # Use the risk_score from enhanced SSL checker if available
+    ssl_risk_score = ssl_results.get('risk_score', 0)
+    # Copy so the checker's (possibly cached) flag list is never mutated
+    ssl_details = list(ssl_results.get('risk_flags', []))
+
+    # If no enhanced risk score, fall back to basic assessment
+    if ssl_risk_score == 0:
+        ssl_risk_score, message = next(
+            (score, message) for matches, score, message in _SSL_FALLBACK_RULES if matches(ssl_results)
+        )
+        ssl_details.append(message.format_map(ssl_results))
+
+    return ssl_risk_score, ssl_details, {}
+
+def _score_redirects(link_results: Dict) -> Tuple[float, List[str], Dict[str, Any]]:
+    redirect_score = 0
+    redirect_details = []
+
+    redirect_chain = link_results.get('redirect_chain', [])
+
+    if len(redirect_chain) > 3:
+        redirect_score = 30  # Medium risk for many redirects
+        redirect_details.append(f"Multiple redirects detected ({len(redirect_chain)})")
+    elif len(redirect_chain) > 0:
+        redirect_score = 15  # Low-medium risk for some redirects
+        redirect_details.append(f"Redirects detected ({len(redirect_chain)})")
+
+    # Check for suspicious redirect patterns
+    if any(_SHORTENER_RE.search(redirect.get('redirect_to', '')) for redirect in redirect_chain):
+        redirect_score += 20
+        redirect_details.append("Redirects through URL shorteners detected")
+
+    return redirect_score, redirect_details, {}
+
+def _score_breaches(breach_results: Dict) -> Tuple[float, List[str], Dict[str, Any]]:
+    breach_score = 0
+    breach_details = []
+
+    password_check = breach_results.get('password_breach_check')
+    if password_check and password_check.get('breached'):
+        breach_score = 50
+        breach_details.append(f"Password found in {password_check.get('breach_count', 0)} breaches")
+
+    email_check = breach_results.get('email_check')
+    if email_check and email_check.get('breached'):
+        breach_score = max(breach_score, 40)
+        breach_details.append(f"Email found in {email_check.get('breach_count', 0)} breaches")
+
+    return breach_score, breach_details, {}
+
+def _score_email_text(email_text_results: Dict) -> Tuple[float, List[str], Dict[str, Any]]:
+    email_score = email_text_results.get('risk_score', 0) * 100  # Convert to 0-100 scale
+    email_details = []
+
+    analysis = email_text_results.get('analysis', {})
+    if analysis.get('top_phishing_indicators'):
+        email_details.append(f"Phishing indicators: {', '.join(analysis['top_phishing_indicators'])}")
+
+    email_details.append(f"Risk level: {analysis.get('risk_level', 'unknown')}")
+
+    return email_score, email_details, {}
+
 class RiskScorer:
     def __init__(self):
         self.weights = {
@@ -10,6 +117,24 @@ class RiskScorer:
             'breach_history': 0.1,
             'email_text_risk': 0.1
         }
+        self._weight_vec = np.array([self.weights[name] for name in RISK_COMPONENTS])
+
+    def calculate_batch(self, score_matrix: np.ndarray) -> np.ndarray:
+        """
+        Weighted overall scores for an (N, 6) matrix of component scores in RISK_COMPONENTS order.
+        Returns an array of N scores clipped to 0-100.
+        """
+        return np.clip(score_matrix @ self._weight_vec, 0, 100)
+
+    # (component key, weight key, extractor) in the order components are reported;
+    # each extractor maps a checker's results to (score, details, extra component fields)
+    _COMPONENTS = (
+        ('url_risk', 'url_risk', _score_url),
+        ('ssl_risk', 'ssl_validity', _score_ssl),
+        ('redirect_risk', 'link_redirects', _score_redirects),
+        ('breach_risk', 'breach_history', _score_breaches),
+        ('email_text_risk', 'email_text_risk', _score_email_text),
+    )
 
     def calculate_overall_risk(self, url_results: Dict = None, ssl_results: Dict = None,
                               link_results: Dict = None, breach_results: Dict = None,
@@ -18,146 +143,33 @@ class RiskScorer:
         Calculate overall risk score based on all security checks.
         Returns comprehensive risk assessment.
         """
+        checker_results = (url_results, ssl_results, link_results, breach_results, email_text_results)
         risk_components = {}
-        total_score = 0
-        max_possible_score = 100
-
-        # URL Risk Assessment
-        if url_results:
-            url_score = url_results.get('risk_score', 0)
-            risk_components['url_risk'] = {
-                'score': url_score,
-                'weight': self.weights['url_risk'],
-                'details': url_results.get('details', []),
-                'recommendation': url_results.get('recommendation', 'unknown')
-            }
-            total_score += url_score * self.weights['url_risk']
-
-        # SSL Risk Assessment - Use enhanced SSL risk scoring
-        if ssl_results:
-            # Use the risk_score from enhanced SSL checker if available
-            ssl_risk_score = ssl_results.get('risk_score', 0)
-            ssl_details = ssl_results.get('risk_flags', [])
-
-            # If no enhanced risk score, fall back to basic assessment
-            if ssl_risk_score == 0:
-                if ssl_results.get('connection_type') == 'http':
-                    ssl_risk_score = 60  # HTTP connection risk
-                    ssl_details.append("Connection is unencrypted (HTTP)")
-                elif ssl_results.get('is_valid') is False:
-                    ssl_risk_score = 80  # High risk for invalid SSL
-                    ssl_details.append("SSL certificate is invalid")
-                elif ssl_results.get('is_expired'):
-                    ssl_risk_score = 60  # Medium-high risk for expired SSL
-                    ssl_details.append("SSL certificate is expired")
-                elif ssl_results.get('days_until_expiry', 30) < 30:
-                    ssl_risk_score = 40  # Medium risk for expiring soon
-                    ssl_details.append(f"SSL certificate expires in {ssl_results.get('days_until_expiry')} days")
-                elif ssl_results.get('is_self_signed'):
-                    ssl_risk_score = 50  # High risk for self-signed
-                    ssl_details.append("Self-signed certificate detected")
-                elif ssl_results.get('is_wildcard'):
-                    ssl_risk_score = 15  # Low-medium risk for wildcard
-                    ssl_details.append("Wildcard certificate - verify subdomain trust")
-                else:
-                    ssl_risk_score = 10  # Low risk for valid SSL
-                    ssl_details.append("SSL certificate is valid")
-
-            risk_components['ssl_risk'] = {
-                'score': ssl_risk_score,
-                'weight': self.weights['ssl_validity'],
-                'details': ssl_details
-            }
-            total_score += ssl_risk_score * self.weights['ssl_validity']
-
-        # Link Expansion Risk Assessment
-        if link_results:
-            redirect_score = 0
-            redirect_details = []
-
-            redirect_chain = link_results.get('redirect_chain', [])
-            final_url = link_results.get('final_url')
-
-            if len(redirect_chain) > 3:
-                redirect_score = 30  # Medium risk for many redirects
-                redirect_details.append(f"Multiple redirects detected ({len(redirect_chain)})")
-            elif len(redirect_chain) > 0:
-                redirect_score = 15  # Low-medium risk for some redirects
-                redirect_details.append(f"Redirects detected ({len(redirect_chain)})")
-
-            # Check for suspicious redirect patterns
-            if redirect_chain:
-                suspicious_redirects = 0
-                for redirect in redirect_chain:
-                    redirect_url = redirect.get('redirect_to', '')
-                    if any(domain in redirect_url.lower() for domain in ['bit.ly', 'tinyurl', 'goo.gl']):
-                        suspicious_redirects += 1
-
-                if suspicious_redirects > 0:
-                    redirect_score += 20
-                    redirect_details.append("Redirects through URL shorteners detected")
-
-            risk_components['redirect_risk'] = {
-                'score': redirect_score,
-                'weight': self.weights['link_redirects'],
-                'details': redirect_details
-            }
-            total_score += redirect_score * self.weights['link_redirects']
-
-        # Breach Risk Assessment
-        if breach_results:
-            breach_score = 0
-            breach_details = []
-
-            if breach_results.get('password_breach_check'):
-                if breach_results['password_breach_check'].get('breached'):
-                    breach_score = 50
-                    count = breach_results['password_breach_check'].get('breach_count', 0)
-                    breach_details.append(f"Password found in {count} breaches")
-
-            if breach_results.get('email_check'):
-                if breach_results['email_check'].get('breached'):
-                    breach_score = max(breach_score, 40)
-                    count = breach_results['email_check'].get('breach_count', 0)
-                    breach_details.append(f"Email found in {count} breaches")
-
-            risk_components['breach_risk'] = {
-                'score': breach_score,
-                'weight': self.weights['breach_history'],
-                'details': breach_details
-            }
-            total_score += breach_score * self.weights['breach_history']
-
-        # Email Text Risk Assessment
-        if email_text_results:
-            email_score = email_text_results.get('risk_score', 0) * 100  # Convert to 0-100 scale
-            email_details = []
-
-            analysis = email_text_results.get('analysis', {})
-            if analysis.get('top_phishing_indicators'):
-                email_details.append(f"Phishing indicators: {', '.join(analysis['top_phishing_indicators'])}")
-
-            risk_level = analysis.get('risk_level', 'unknown')
-            email_details.append(f"Risk level: {risk_level}")
-
-            risk_components['email_text_risk'] = {
-                'score': email_score,
-                'weight': self.weights['email_text_risk'],
-                'details': email_details
-            }
-            total_score += email_score * self.weights['email_text_risk']
+        component_scores = {}
+        skipped_weight = 0.0
+
+        for (name, weight_key, extract), results in zip(self._COMPONENTS, checker_results):
+            if not results:
+                continue
+            if results.get('skipped'):
+                # The check never ran; leave it out and spread its weight over the others
+                skipped_weight += self.weights[weight_key]
+                continue
+            score, details, extra = extract(results)
+            weight = self.weights[weight_key]
+            risk_components[name] = {'score': score, 'weight': weight, 'details': details, **extra}
+            component_scores[weight_key] = score
 
         # Domain Reputation (placeholder - would need external API)
-        domain_score = 0  # Placeholder
         risk_components['domain_reputation'] = {
-            'score': domain_score,
+            'score': 0,
             'weight': self.weights['domain_reputation'],
             'details': ["Domain reputation check not implemented"]
         }
-        total_score += domain_score * self.weights['domain_reputation']
 
         # Calculate final risk level
-        final_score = min(100, max(0, total_score))
+        scores = np.array([[component_scores.get(name, 0) for name in RISK_COMPONENTS]], dtype=float)
+        final_score = min(100.0, float(self.calculate_batch(scores)[0]) / (1.0 - skipped_weight))
 
         risk_level = self._get_risk_level(final_score)
         recommendations = self._get_recommendations(final_score, risk_components)
@@ -172,29 +184,11 @@ class RiskScorer:
 
     def _get_risk_level(self, score: float) -> str:
         """Convert numerical score to risk level."""
-        if score >= 70:
-            return "high"
-        elif score >= 40:
-            return "medium"
-        elif score >= 20:
-            return "low"
-        else:
-            return "very_low"
+        return _LEVEL_NAMES[bisect.bisect_right(_LEVEL_THRESHOLDS, score)]
 
     def _get_recommendations(self, score: float, components: Dict) -> List[str]:
         """Generate actionable recommendations based on risk assessment."""
-        recommendations = []
-
-        if score >= 70:
-            recommendations.append("🚨 HIGH RISK: Do not proceed. This appears to be malicious.")
-            recommendations.append("Report this URL to security authorities if appropriate.")
-        elif score >= 40:
-            recommendations.append("⚠️ MEDIUM RISK: Exercise caution when interacting with this resource.")
-            recommendations.append("Verify the destination manually before proceeding.")
-        elif score >= 20:
-            recommendations.append("ℹ️ LOW RISK: Generally safe, but monitor for suspicious activity.")
-        else:
-            recommendations.append("✅ VERY LOW RISK: This resource appears safe to use.")
+        recommendations = list(_LEVEL_RECOMMENDATIONS[bisect.bisect_right(_LEVEL_THRESHOLDS, score)])
 
         # Component-specific recommendations
         if 'ssl_risk' in components and components['ssl_risk']['score'] >= 60:
@@ -213,7 +207,6 @@ class RiskScorer:
 
     def _get_timestamp(self) -> str:
         """Get current timestamp for assessment."""
-        from datetime import datetime
         return datetime.utcnow().isoformat()
 
 def quick_risk_assessment(url: str = None, email: str = None, password: str = None) -> Dict[str, Any]:
@@ -231,8 +224,7 @@ def quick_risk_assessment(url: str = None, email: str = None, password: str = No
             score += 10
             factors.append("Uses HTTP instead of HTTPS")
 
-        suspicious_patterns = ['login', 'password', 'bank', 'paypal', 'secure']
-        if any(pattern in url.lower() for pattern in suspicious_patterns):
+        if _SUSPICIOUS_KEYWORD_RE.search(url):
             score += 15
             factors.append("Contains sensitive keywords")
 
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Dict, List, Any, Tuple
 
 class RiskScorer:
@@ -217,7 +218,6 @@ class RiskScorer:
 
     def _get_timestamp(self) -> str:
         """Get current timestamp for assessment."""
-        from datetime import datetime
         return datetime.utcnow().isoformat()
 
 def quick_risk_assessment(url: str = None, email: str = None, password: str = None) -> Dict[str, Any]: